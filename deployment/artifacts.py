@@ -0,0 +1,59 @@
+# Helpers shared by the .npz artifacts built offline and reused across runs:
+# the NumPy inference engine and the co-occurrence and n-gram indexes. Each
+# stores its layout version and a stamp of the inputs it was built from, so
+# a stale or old-layout file is rebuilt instead of read.
+import os
+import numpy as np
+
+
+def encode_strings(strings):
+    # One UTF-8 blob, string i on line i; far smaller than a fixed-width string array
+    return np.frombuffer('\n'.join(strings).encode('utf-8'), dtype=np.uint8)
+
+
+def decode_strings(array):
+    return array.tobytes().decode('utf-8').split('\n') if array.size else []
+
+
+def save_npz(path, compressed=False, **arrays):
+    """
+    Write arrays to a .npz, replacing path atomically.
+
+    np.savez appends .npz to names without it, so the temporary file is
+    written through a file object. Uncompressed members can be memory-mapped
+    straight out of the archive.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        (np.savez_compressed if compressed else np.savez)(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def check_layout(data, key, expected, path):
+    # Raise if an open .npz was written with another layout version
+    found = int(data[key])
+    if found != expected:
+        raise ValueError(f"{path} has {key.replace('_', ' ')} {found}, expected {expected}")
+
+
+def is_current(path, key, layout_version, source_version, **settings):
+    """
+    Whether a saved artifact can be reused as is.
+
+    Args:
+        key (str): Name of the stored layout version, e.g. 'index_version'.
+        layout_version (int): Layout the reading module expects; bump it when
+            the .npz layout changes so older files are rebuilt.
+        source_version (str): Stamp of the inputs the artifact must be built from.
+        **settings: Further stored scalars that must match, e.g. window_size=110.
+
+    Returns:
+        bool: False if the file is missing, an old layout, built from other
+            inputs or with other settings.
+    """
+    if not os.path.exists(path):
+        return False
+    with np.load(path, allow_pickle=False) as data:
+        if int(data[key]) != layout_version or str(data['source_version']) != source_version:
+            return False
+        return all(data[name].item() == value for name, value in settings.items())
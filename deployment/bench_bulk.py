@@ -0,0 +1,77 @@
+# Throughput benchmark: bulk CSV scoring vs. looping the single-review Analyze path
+# Run from the deployment folder: python bench_bulk.py [csv_path] [n_rows]
+import sys
+import time
+import numpy as np
+import pandas as pd
+import prepro_script
+from bulk_scoring import score_single, score_texts
+from model_registry import TOPIC_LABELS, get_dictionary, get_lda_model
+from topic_cache import topic_cache, topic_probabilities
+from translation import FakeTranslator, TranslationWorker
+
+JELEK_LABELS = TOPIC_LABELS['jelek']
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else '../cleaned_reviews.csv'
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    texts = pd.read_csv(csv_path)['reviews'].dropna().astype(str).head(n_rows).tolist()
+    lda_model = get_lda_model('jelek')
+    dictionary = get_dictionary('jelek')
+
+    # Translation is network-bound; echo the text so only local work is timed
+    prepro_script.preprocessor.translation_worker = TranslationWorker(FakeTranslator)
+    prepro_script.warmup()
+
+    # Start both runs from a cold stem cache and topic cache
+    prepro_script.preprocessor.stem_cache.clear()
+    topic_cache.clear()
+    start = time.perf_counter()
+    looped = [score_single(text, 'jelek') for text in texts]
+    loop_time = time.perf_counter() - start
+
+    prepro_script.preprocessor.stem_cache.clear()
+    topic_cache.clear()
+    start = time.perf_counter()
+    bulk = score_texts(texts, JELEK_LABELS, 'jelek')
+    bulk_time = time.perf_counter() - start
+    cold_cache = topic_cache.stats()
+
+    # Same upload again: every scored review is a topic cache hit
+    start = time.perf_counter()
+    score_texts(texts, JELEK_LABELS, 'jelek')
+    warm_time = time.perf_counter() - start
+
+    # Inference starts from a random gamma, so probabilities agree up to convergence tolerance
+    labels = list(JELEK_LABELS.values())
+    drift = [np.abs(bulk.loc[i, labels].to_numpy(dtype=float) - [prob for _, prob in topics]).max()
+             for i, (_, topics) in enumerate(looped) if topics is not None]
+    same_topic = sum(bulk.loc[i, 'topic'] == JELEK_LABELS[max(topics, key=lambda x: x[1])[0]]
+                     for i, (_, topics) in enumerate(looped) if topics is not None)
+
+    # Inference alone, on the same bag-of-words vectors
+    bows = [dictionary.doc2bow(processed.split()) for processed, topics in looped if topics is not None]
+    start = time.perf_counter()
+    for bow in bows:
+        lda_model.get_document_topics(bow, minimum_probability=0.0)
+    single_infer = time.perf_counter() - start
+    start = time.perf_counter()
+    topic_probabilities(lda_model, bows)
+    bulk_infer = time.perf_counter() - start
+
+    print(f"Rows: {len(texts)} ({len(drift)} scored)")
+    print(f"Single loop: {loop_time:.2f}s ({len(texts) / loop_time:.0f} rows/s)")
+    print(f"Bulk       : {bulk_time:.2f}s ({len(texts) / bulk_time:.0f} rows/s)")
+    print(f"Speedup: {loop_time / bulk_time:.2f}x")
+    print(f"Bulk again : {warm_time:.2f}s ({len(texts) / warm_time:.0f} rows/s, warm topic cache)")
+    print(f"Topic cache hit rate: {cold_cache['hit_rate']:.1%} on first run "
+          f"({cold_cache['size']} distinct reviews), {topic_cache.stats()['hit_rate']:.1%} after both")
+    print(f"Inference only: {single_infer * 1000:.0f} ms looped vs {bulk_infer * 1000:.0f} ms in one call "
+          f"({single_infer / bulk_infer:.1f}x)")
+    print(f"Same dominant topic: {same_topic}/{len(drift)}, max probability difference: {max(drift, default=0):.4f}")
+
+
+if __name__ == '__main__':
+    main()
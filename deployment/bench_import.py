@@ -0,0 +1,50 @@
+# Cold-start benchmark: import time of the preprocessing module and the app
+# Each measurement runs in a fresh interpreter. Usage: python bench_import.py [runs]
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CASES = {
+    'import prepro_script': "import prepro_script",
+    'prepro_script + warmup()': "import prepro_script; prepro_script.warmup()",
+    'jelek model + dictionary': "from model_registry import get_dictionary, get_lda_model; "
+                                "get_lda_model('jelek'); get_dictionary('jelek')",
+    'jelek numpy engine': "from model_registry import get_engine; get_engine('jelek')",
+    'import ryan_main (app)': "import ryan_main",
+}
+
+TIMER = """
+import time
+_start = time.perf_counter()
+{code}
+print(time.perf_counter() - _start)
+"""
+
+
+def measure(code, runs):
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', TIMER.format(code=code)],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return times
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, code in CASES.items():
+        try:
+            times = measure(code, runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<28} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{name:<28} median {statistics.median(times):.3f}s  min {min(times):.3f}s  ({runs} runs)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# Latency benchmark: gensim LdaModel vs. the NumPy inference engine (numpy_lda.py)
+# Run from the deployment folder: python bench_numpy_lda.py [csv_path] [n_rows]
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+from model_registry import MODEL_NAMES, ModelRegistry
+from numpy_lda import load_engine
+
+COLD_START = {
+    'gensim': "from gensim.models import LdaModel; from gensim.corpora import Dictionary; "
+              "LdaModel.load('model_dicts/{name}_lda_model.model', mmap='r'); "
+              "Dictionary.load('model_dicts/{name}_lda_dictionary.dict')",
+    'numpy': "from numpy_lda import NumpyLda; NumpyLda.load('model_dicts/{name}_lda_engine.npz')",
+}
+
+
+def cold_start(code, runs=3):
+    # Import + load in a fresh interpreter
+    timer = f"import time; _start = time.perf_counter()\n{code}\nprint(time.perf_counter() - _start)"
+    return statistics.median(
+        float(subprocess.run([sys.executable, '-c', timer], capture_output=True, text=True, check=True).stdout)
+        for _ in range(runs)
+    )
+
+
+def per_call_ms(func, items):
+    times = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 95)
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else '../prepro_cleaned_reviews.csv'
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    texts = pd.read_csv(csv_path)['processed_reviews'].dropna().astype(str).head(n_rows).tolist()
+    registry = ModelRegistry()
+
+    for name in MODEL_NAMES:
+        lda_model, dictionary = registry.lda_model(name), registry.dictionary(name)
+        engine = load_engine(name)
+        bows = [dictionary.doc2bow(text.split()) for text in texts]
+
+        print(f"{name} ({len(bows)} documents)")
+        for label, code in COLD_START.items():
+            print(f"  cold import + load   {label:<7} {cold_start(code.format(name=name)):.3f}s")
+
+        gensim_single = per_call_ms(lambda bow: lda_model.get_document_topics(bow, minimum_probability=0.0), bows)
+        numpy_single = per_call_ms(lambda bow: engine.get_document_topics(bow, minimum_probability=0.0), bows)
+        print(f"  single review        gensim  p50 {gensim_single[0]:.3f} ms  p95 {gensim_single[1]:.3f} ms")
+        print(f"                       numpy   p50 {numpy_single[0]:.3f} ms  p95 {numpy_single[1]:.3f} ms")
+
+        for label, model in (('gensim', lda_model), ('numpy', engine)):
+            start = time.perf_counter()
+            for i in range(0, len(bows), 256):
+                model.inference(bows[i:i + 256])
+            elapsed = time.perf_counter() - start
+            print(f"  batches of 256       {label:<7} {elapsed * 1000:.0f} ms ({len(bows) / elapsed:.0f} docs/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# Throughput benchmark: text_preprocessing_batch vs. looping text_preprocessing_id
+# Run from the deployment folder: python bench_prepro.py [csv_path] [n_rows]
+import sys
+import time
+import pandas as pd
+import prepro_script
+from translation import FakeTranslator, TranslationWorker
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else '../cleaned_reviews.csv'
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    texts = pd.read_csv(csv_path)['reviews'].dropna().astype(str).head(n_rows).tolist()
+    # Translation is network-bound; echo the text so only local work is timed
+    prepro_script.preprocessor.translation_worker = TranslationWorker(FakeTranslator)
+    prepro_script.warmup()
+
+    # Start both runs from a cold stem cache
+    prepro_script.preprocessor.stem_cache.clear()
+    start = time.perf_counter()
+    looped = [prepro_script.text_preprocessing_id(text) for text in texts]
+    loop_time = time.perf_counter() - start
+
+    prepro_script.preprocessor.stem_cache.clear()
+    start = time.perf_counter()
+    batched = prepro_script.text_preprocessing_batch(texts)
+    batch_time = time.perf_counter() - start
+
+    # Per-stage profile of the batch path
+    pipeline = prepro_script.preprocessor.pipeline.without()
+    stats = pipeline.instrument()
+    prepro_script.preprocessor.stem_cache.clear()
+    pipeline.run_batch(texts)
+
+    mismatches = sum(a != b for a, b in zip(looped, batched))
+    print(f"Rows: {len(texts)}")
+    print(f"Loop : {loop_time:.2f}s ({len(texts) / loop_time:.0f} rows/s)")
+    print(f"Batch: {batch_time:.2f}s ({len(texts) / batch_time:.0f} rows/s)")
+    print(f"Stem cache: {prepro_script.preprocessor.stem_cache.stats()}")
+    print(f"Speedup: {loop_time / batch_time:.2f}x, mismatches: {mismatches}")
+    print("Batch stages:")
+    for name, row in stats.report().items():
+        print(f"  {name:<13} {row['seconds']:7.3f}s  {row['share']:6.1%}  {row['calls']:8d} calls")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# End-to-end Analysis response time: the original row-scan page path vs the report engine
+# Run from the deployment folder: python bench_report.py [jelek|bagus] [n_selections]
+import io
+import sys
+import time
+from collections import Counter
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from nltk import word_tokenize
+from nltk.util import ngrams
+from wordcloud import WordCloud
+from labeled_store import store
+from report_engine import ALL_PROVINCES, DATASETS, build_report
+from wordcloud_cache import wordcloud_cache
+
+
+def scan_report(csv_path, labels, company, province):
+    # What one submit used to do: read and mask the CSV, scan per topic, re-count every word and n-gram
+    df = pd.read_csv(csv_path)
+    if province == ALL_PROVINCES:
+        filtered_df = df[df['company'] == company]
+    else:
+        filtered_df = df[(df['company'] == company) & (df['province'] == province)]
+    filtered_df = filtered_df.copy()
+    filtered_df['processed_reviews'] = filtered_df['processed_reviews'].fillna('').astype(str)
+
+    topic_counts = filtered_df['topic'].value_counts()
+    counts = [len(filtered_df[filtered_df['topic'] == label]) for label in labels]
+
+    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(' '.join(filtered_df['processed_reviews']))
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.imshow(wordcloud, interpolation='bilinear')
+    ax.axis("off")
+    fig.savefig(io.BytesIO(), format='png')  # st.pyplot renders the figure to PNG
+    plt.close(fig)
+
+    filtered_df['words_list'] = filtered_df['processed_reviews'].apply(lambda x: str(x).split())
+    top_words = Counter([word for words in filtered_df['words_list'] for word in words]).most_common(5)
+    bigrams, trigrams = [], []
+    for review in filtered_df['processed_reviews']:
+        tokens = word_tokenize(review)
+        bigrams.extend(ngrams(tokens, 2))
+        trigrams.extend(ngrams(tokens, 3))
+    return topic_counts, counts, top_words, Counter(bigrams).most_common(10), Counter(trigrams).most_common(10)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    dataset = sys.argv[1] if len(sys.argv) > 1 else 'jelek'
+    n_selections = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    config = DATASETS[dataset]
+    labels = [label for label, _ in config['topics']]
+
+    # The busiest company, all provinces and then its largest provinces
+    df = pd.read_csv(config['csv'])
+    company = df['company'].mode()[0]
+    provinces = df.loc[df['company'] == company, 'province'].value_counts().index.tolist()
+    selections = [ALL_PROVINCES] + provinces[:n_selections - 1]
+
+    scan_times = [timed(scan_report, config['csv'], labels, company, province)[0] for province in selections]
+
+    # Cold start: nothing loaded in this process (the snapshot and n-gram index files may already exist)
+    store.clear()
+    wordcloud_cache.clear()
+    load_seconds, _ = timed(store.get, config['csv'])
+    first_times, reports = zip(*[timed(build_report, dataset, company, province) for province in selections])
+    repeat_times = [timed(build_report, dataset, company, province)[0] for province in selections]
+
+    mismatches = 0
+    for province, report in zip(selections, reports):
+        topic_counts, counts, top_words, bigrams, trigrams = scan_report(config['csv'], labels, company, province)
+        mismatches += (report.topic_counts.to_dict() != topic_counts[topic_counts > 0].to_dict()
+                       or report.top_words != top_words or report.bigrams != bigrams or report.trigrams != trigrams)
+
+    def summary(times):
+        return f"mean {np.mean(times) * 1000:8.1f} ms, max {np.max(times) * 1000:8.1f} ms"
+
+    print(f"{dataset}: {company}, {len(selections)} selections ({', '.join(map(str, selections))})")
+    print(f"  row scans (original page)   {summary(scan_times)}")
+    print(f"  report engine, first view   {summary(first_times)}  (after {load_seconds * 1000:.0f} ms data load)")
+    print(f"  report engine, repeat view  {summary(repeat_times)}")
+    print(f"  speedup: {np.mean(scan_times) / np.mean(first_times):.1f}x first view, "
+          f"{np.mean(scan_times) / np.mean(repeat_times):.0f}x repeat; "
+          f"{mismatches} selections with different counts or tables")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# Bulk topic scoring for uploaded review CSVs (Inference page)
+import io
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from inference_client import client
+from model_registry import get_engine
+from prepro_script import text_preprocessing_batch, text_preprocessing_id
+from topic_cache import cached_topic_probabilities, topic_cache
+
+
+def score_texts(texts, topic_labels, model='jelek', chunksize=256, progress=None, client=None):
+    """
+    Preprocess and score reviews chunk by chunk.
+
+    Args:
+        texts (list): Raw reviews.
+        topic_labels (dict): topic id -> label, used as column names.
+        model (str): Model name, 'jelek' or 'bagus'.
+        chunksize (int): Reviews preprocessed and inferred per call.
+        progress (callable): Optional progress(done, total) callback.
+        client (inference_client.InferenceClient): Score through the inference
+            service instead of in this process.
+
+    Returns:
+        pandas.DataFrame: processed_reviews, one probability column per topic and
+        the dominant topic. Rows that are empty after preprocessing, or whose
+        translation failed, have no probabilities.
+    """
+    texts = list(texts)
+    labels = [topic_labels[topic_id] for topic_id in range(len(topic_labels))]
+    probabilities = np.full((len(texts), len(labels)), np.nan)
+    processed = [None] * len(texts)
+
+    for start in range(0, len(texts), chunksize):
+        if client is not None:
+            # The service preprocesses and scores the chunk in its own process. It only
+            # takes strings, so empty CSV cells (NaN) stay unscored, as they do locally
+            chunk = texts[start:start + chunksize]
+            sent = [i for i, text in enumerate(chunk) if isinstance(text, str)]
+            results = client.score_many([chunk[i] for i in sent], model) if sent else []
+            for i, result in zip(sent, results):
+                processed[start + i] = result['processed']
+                if result['topics']:
+                    probabilities[start + i] = [topic['probability'] for topic in result['topics']]
+        else:
+            chunk = text_preprocessing_batch(texts[start:start + chunksize])
+            processed[start:start + chunksize] = chunk
+
+            # Empty or failed reviews are skipped, like the single-review path
+            scored = [i for i, text in enumerate(chunk) if text]
+            engine = get_engine(model)
+            bows = [engine.doc2bow(chunk[i].split()) for i in scored]
+            probabilities[[start + i for i in scored]] = cached_topic_probabilities(model, bows)
+        if progress:
+            progress(min(start + chunksize, len(texts)), len(texts))
+
+    result = pd.DataFrame(probabilities, columns=labels)
+    result.insert(0, 'processed_reviews', processed)
+    result['topic'] = [labels[row.argmax()] if text else None for row, text in zip(probabilities, processed)]
+    return result
+
+
+def score_single(text, model='jelek'):
+    # Same steps as the single-review Analyze button; shares the topic cache with bulk scoring
+    processed = text_preprocessing_id(text)
+    if not processed:
+        return processed, None
+    bow_vector = get_engine(model).doc2bow(processed.split())
+    return processed, [(topic_id, float(prob))
+                       for topic_id, prob in enumerate(cached_topic_probabilities(model, [bow_vector])[0])]
+
+
+def bulk_scoring_section(topic_labels, model='jelek', column='reviews'):
+    # Streamlit widget: upload a CSV, score every row, download the result
+    st.subheader("Bulk Scoring")
+    uploaded = st.file_uploader("Upload a CSV of reviews", type="csv")
+    if uploaded is None:
+        return
+
+    df = pd.read_csv(uploaded)
+    columns = df.columns.tolist()
+    review_column = st.selectbox("Review column", columns,
+                                 index=columns.index(column) if column in columns else 0)
+
+    if st.button("Score CSV"):
+        progress_bar = st.progress(0.0, text="Scoring reviews...")
+
+        def progress(done, total):
+            progress_bar.progress(done / total, text=f"Scored {done} / {total} reviews")
+
+        start = time.perf_counter()
+        texts = df[review_column].tolist()
+        if client.is_available():
+            scores = score_texts(texts, topic_labels, model, progress=progress, client=client)
+            cache = client.metrics().get('topic_cache')
+        else:
+            # No inference service running: score in this process
+            scores = score_texts(texts, topic_labels, model, progress=progress)
+            cache = topic_cache.stats()
+        elapsed = time.perf_counter() - start
+
+        # Scores replace any columns of the same name from an earlier run
+        result = pd.concat([df.drop(columns=scores.columns, errors='ignore').reset_index(drop=True), scores], axis=1)
+        st.success(f"Scored {len(result)} reviews in {elapsed:.1f}s ({len(result) / elapsed if elapsed else 0:.0f} reviews/s)")
+        if cache:
+            st.caption(f"Topic cache: {cache['hit_rate']:.0%} hit rate, {cache['size']} cached reviews")
+        st.dataframe(result.head(50))
+
+        buffer = io.StringIO()
+        result.to_csv(buffer, index=False)
+        st.download_button("Download scored CSV", buffer.getvalue(),
+                           file_name="scored_reviews.csv", mime="text/csv")
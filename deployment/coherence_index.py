@@ -0,0 +1,209 @@
+# Persistent co-occurrence index for c_v topic coherence.
+# gensim's CoherenceModel rescans every text with a 110-token sliding window on
+# each call. The window counts do not depend on the topics, so they are built
+# once over the whole vocabulary, saved as a sparse matrix, and any topic set is
+# scored from it. Build and compare with gensim: python coherence_index.py [jelek|bagus]
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse as sps
+from artifacts import check_layout, decode_strings, encode_strings, is_current, save_npz
+from model_registry import MODEL_DIR
+from tokenizer import fast_word_tokenize
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = os.path.join(BASE_DIR, '..', 'prepro_cleaned_reviews.csv')
+
+# .npz layout version, see artifacts.is_current
+INDEX_VERSION = 1
+
+# gensim's c_v settings
+WINDOW_SIZE = 110
+TOPN = 20
+EPSILON = 1e-12
+
+
+def load_token_lists(input_path, name):
+    # Same split and tokenization as the notebook: ratings 1-3 are jelek, 4-5 bagus.
+    # Empty reviews become the token 'nan', as the notebook's astype(str) did for the saved models
+    df = pd.read_csv(input_path)
+    rows = df[df['rating'] <= 3] if name == 'jelek' else df[df['rating'] >= 4]
+    return [fast_word_tokenize(text) for text in rows['processed_reviews'].fillna('nan').astype(str)]
+
+
+def index_path(name, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f'{name}_cooccurrence.npz')
+
+
+def iter_windows(ids, window_size):
+    """
+    Word sets of each sliding window, as gensim's WordOccurrenceAccumulator sees them.
+
+    Texts shorter than the window are one window. Longer ones slide one token
+    at a time, and the token leaving the window is cleared even if it occurs
+    again inside it, exactly like gensim's incremental update.
+    """
+    if len(ids) < window_size:
+        yield set(ids)
+        return
+    current = set(ids[:window_size])
+    yield current
+    for k in range(1, len(ids) - window_size + 1):
+        current.discard(ids[k - 1])
+        current.add(ids[k + window_size - 1])
+        yield current
+
+
+class CooccurrenceIndex:
+    """
+    Boolean sliding-window counts over a tokenized corpus.
+
+    Args:
+        tokens (list): Vocabulary; token i is row/column i of counts.
+        counts (scipy.sparse.csr_matrix): Upper triangle of the symmetric
+            (vocabulary, vocabulary) window co-occurrence counts; the diagonal
+            holds each word's window count.
+        num_windows (int): Number of windows, the denominator of every probability.
+    """
+
+    def __init__(self, tokens, counts, num_windows, window_size=WINDOW_SIZE):
+        self.tokens = list(tokens)
+        self.token2id = {token: i for i, token in enumerate(self.tokens)}
+        self.counts = counts.tocsr()
+        self.num_windows = num_windows
+        self.window_size = window_size
+
+    @classmethod
+    def build(cls, token_lists, window_size=WINDOW_SIZE):
+        token2id = {}
+        rows, cols = [], []
+        num_windows = 0
+        for tokens in token_lists:
+            ids = [token2id.setdefault(token, len(token2id)) for token in tokens]
+            for window in iter_windows(ids, window_size):
+                rows.extend([num_windows] * len(window))
+                cols.extend(window)
+                num_windows += 1
+
+        # (windows, vocabulary) membership; W.T @ W counts windows per word pair
+        membership = sps.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                                    shape=(num_windows, len(token2id)))
+        counts = sps.triu(membership.T @ membership, format='csr')
+        return cls(token2id, counts, num_windows, window_size)
+
+    def save(self, path, source_version=''):
+        save_npz(
+            path,
+            compressed=True,
+            index_version=INDEX_VERSION,
+            source_version=source_version,
+            tokens=encode_strings(self.tokens),
+            data=self.counts.data, indices=self.counts.indices, indptr=self.counts.indptr,
+            shape=np.array(self.counts.shape),
+            num_windows=self.num_windows,
+            window_size=self.window_size,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            check_layout(data, 'index_version', INDEX_VERSION, path)
+            counts = sps.csr_matrix((data['data'], data['indices'], data['indptr']), shape=tuple(data['shape']))
+            return cls(decode_strings(data['tokens']), counts, int(data['num_windows']), int(data['window_size']))
+
+    def pair_counts(self, tokens):
+        # Dense symmetric window counts among the given tokens; the diagonal is each word's count
+        missing = [token for token in tokens if token not in self.token2id]
+        if missing:
+            raise ValueError(f"Tokens not in the co-occurrence index: {missing}")
+        ids = [self.token2id[token] for token in tokens]
+        block = self.counts[ids][:, ids].toarray().astype(np.float64)
+        return block + block.T - np.diag(np.diag(block))
+
+    def topic_coherence(self, topic):
+        """
+        c_v coherence of one topic: every word's NPMI context vector compared,
+        by cosine, with the sum of all of them, averaged over the words.
+        """
+        counts = self.pair_counts(topic)
+        joint = counts / self.num_windows
+        single = np.diag(joint)
+        npmi = np.log((joint + EPSILON) / np.outer(single, single)) / -np.log(joint + EPSILON)
+
+        topic_vector = npmi.sum(axis=0)
+        similarities = npmi @ topic_vector / (np.linalg.norm(npmi, axis=1) * np.linalg.norm(topic_vector))
+        return float(similarities.mean())
+
+    def coherence(self, topics):
+        """
+        c_v coherence of a topic set, as CoherenceModel(coherence='c_v') computes it.
+
+        Args:
+            topics (list): One list of top words per topic.
+
+        Returns:
+            tuple: (mean coherence, per-topic coherences)
+        """
+        per_topic = [self.topic_coherence(topic) for topic in topics]
+        return float(np.mean(per_topic)), per_topic
+
+
+def topics_from_model(lda_model, topn=TOPN):
+    # Top words per topic, chosen like CoherenceModel's matutils.argsort(topic, topn, reverse=True)
+    topics = []
+    for topic in lda_model.get_topics():
+        negated = -topic
+        top = np.argpartition(negated, topn)[:topn] if topn < len(topic) else np.arange(len(topic))
+        top = top.take(np.argsort(negated.take(top)))
+        topics.append([lda_model.id2word[int(word_id)] for word_id in top])
+    return topics
+
+
+def source_version(input_path, name):
+    stat = os.stat(input_path)
+    return f"{os.path.abspath(input_path)}:{stat.st_mtime_ns}:{stat.st_size}:{name}"
+
+
+def load_index(name, input_path=DEFAULT_INPUT, model_dir=MODEL_DIR, window_size=WINDOW_SIZE):
+    # Rebuild if the index is missing, built from another version of the texts or an old layout
+    path = index_path(name, model_dir)
+    version = source_version(input_path, name)
+    if is_current(path, 'index_version', INDEX_VERSION, version, window_size=window_size):
+        return CooccurrenceIndex.load(path)
+
+    print(f"Co-occurrence index {path} is missing or stale; building it from {input_path}")
+    index = CooccurrenceIndex.build(load_token_lists(input_path, name), window_size)
+    index.save(path, version)
+    return index
+
+
+if __name__ == '__main__':
+    from gensim.models import CoherenceModel
+    from model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    for name in sys.argv[1:] or ['jelek', 'bagus']:
+        start = time.perf_counter()
+        token_lists = load_token_lists(DEFAULT_INPUT, name)
+        index = CooccurrenceIndex.build(token_lists)
+        index.save(index_path(name), source_version(DEFAULT_INPUT, name))
+        build_seconds = time.perf_counter() - start
+
+        lda_model, dictionary = registry.lda_model(name), registry.dictionary(name)
+        start = time.perf_counter()
+        reference = CoherenceModel(model=lda_model, texts=token_lists, dictionary=dictionary,
+                                   coherence='c_v', processes=1).get_coherence()
+        gensim_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = CooccurrenceIndex.load(index_path(name))
+        score, _ = index.coherence(topics_from_model(lda_model))
+        index_seconds = time.perf_counter() - start
+
+        print(f"{name}: {index.num_windows} windows, {len(index.tokens)} words, {index.counts.nnz} pairs; "
+              f"built in {build_seconds:.2f}s ({os.path.getsize(index_path(name)) / 1024:.0f} KiB)")
+        print(f"  c_v gensim {reference:.6f} in {gensim_seconds:.2f}s, "
+              f"index {score:.6f} in {index_seconds * 1000:.1f} ms (load + score), "
+              f"difference {abs(score - reference):.1e}")
@@ -0,0 +1,128 @@
+# Dual-model scoring: preprocess a review once, score it against both the
+# jelek (bad reviews) and bagus (good reviews) LDA models, and route it by
+# supplied rating or predicted polarity.
+import numpy as np
+import streamlit as st
+from inference_client import score_review_dual
+from model_registry import MODEL_NAMES, TOPIC_LABELS, get_engine
+from prepro_script import text_preprocessing_batch
+from topic_cache import cached_topic_probabilities
+
+# Log-probability given to words a model's dictionary does not know; shared by
+# both models so neither is favoured for vocabulary it lacks
+OOV_LOG_PROB = np.log(1e-6)
+
+
+def rating_polarity(rating):
+    # Same split as the notebook: ratings 1-3 are bad reviews, 4-5 good ones
+    return 'jelek' if rating <= 3 else 'bagus'
+
+
+def word_log_likelihood(lda_model, bows, probabilities, token_counts):
+    """
+    Mean log-likelihood per token of each document under the model, using the
+    inferred topic mixture. Tokens missing from the dictionary count as OOV_LOG_PROB.
+
+    Returns:
+        numpy.ndarray: One value per document.
+    """
+    topics = lda_model.get_topics()
+    scores = np.empty(len(bows))
+    for i, (bow, theta, total) in enumerate(zip(bows, probabilities, token_counts)):
+        known = 0
+        log_likelihood = 0.0
+        if bow:
+            ids, counts = zip(*bow)
+            counts = np.asarray(counts)
+            log_likelihood = float(counts @ np.log(theta @ topics[:, list(ids)]))
+            known = counts.sum()
+        log_likelihood += (total - known) * OOV_LOG_PROB
+        scores[i] = log_likelihood / total
+    return scores
+
+
+def score_processed(processed, ratings=None):
+    """
+    Score already preprocessed reviews against every model.
+
+    Args:
+        processed (list): Preprocessed reviews; None or '' are not scored.
+        ratings (list): Optional star ratings (None where unknown) used for routing.
+
+    Returns:
+        list: Per review, None if it was not scored, else a dict with 'polarity'
+        (routed model), 'polarity_source' ('rating' or 'predicted') and, per
+        model, 'topics' [(topic_id, probability)] and 'log_likelihood'.
+    """
+    ratings = ratings if ratings is not None else [None] * len(processed)
+    scored = [i for i, text in enumerate(processed) if text]
+    token_lists = [processed[i].split() for i in scored]
+
+    per_model = {}
+    for name in MODEL_NAMES:
+        engine = get_engine(name)
+        bows = [engine.doc2bow(tokens) for tokens in token_lists]
+        probabilities = cached_topic_probabilities(name, bows)
+        log_likelihoods = word_log_likelihood(engine, bows, probabilities, [len(t) for t in token_lists])
+        per_model[name] = (probabilities, log_likelihoods)
+
+    results = [None] * len(processed)
+    for row, i in enumerate(scored):
+        models = {
+            name: {
+                'topics': [(topic_id, float(prob)) for topic_id, prob in enumerate(probabilities[row])],
+                'log_likelihood': float(log_likelihoods[row]),
+            }
+            for name, (probabilities, log_likelihoods) in per_model.items()
+        }
+        if ratings[i] is not None:
+            polarity, source = rating_polarity(ratings[i]), 'rating'
+        else:
+            polarity, source = max(models, key=lambda name: models[name]['log_likelihood']), 'predicted'
+        results[i] = {'polarity': polarity, 'polarity_source': source, 'models': models}
+    return results
+
+
+def score_dual(texts, ratings=None):
+    """
+    Preprocess reviews once and score them against both models.
+
+    Returns:
+        list: (processed review, score_processed result) per review.
+    """
+    processed = text_preprocessing_batch(texts)
+    return list(zip(processed, score_processed(processed, ratings)))
+
+
+def dual_scoring_section():
+    # Streamlit widget: one review, both models, routed by rating or predicted polarity
+    st.subheader("Dual-Model Analysis")
+    review = st.text_area("Enter a review to score against both models", height=100, key='dual_review')
+    rating = st.selectbox("Rating (optional)", [None, 1, 2, 3, 4, 5],
+                          format_func=lambda value: "Unknown" if value is None else f"{value} stars")
+
+    if st.button("Analyze with both models"):
+        if not review.strip():
+            st.warning("Please enter a review before clicking Analyze.")
+            return
+        with st.spinner("Processing review..."):
+            try:
+                processed, result = score_review_dual(review, rating)
+            except Exception as e:
+                st.error(f"Error during preprocessing: {e}")
+                return
+
+        if not result:
+            st.warning("Nothing left to score after preprocessing.")
+            return
+
+        polarity = result['polarity']
+        how = "from the rating" if result['polarity_source'] == 'rating' else "predicted from model fit"
+        st.write(f"**Processed Review**: {processed}")
+        st.write(f"**Routed to**: {'bad' if polarity == 'jelek' else 'good'} review topics ({how})")
+
+        for name in sorted(result['models'], key=lambda name: name != polarity):
+            scores = result['models'][name]
+            st.write(f"**{name.capitalize()} model** (log-likelihood per word {scores['log_likelihood']:.2f}):")
+            for topic_id, prob in scores['topics']:
+                st.write(f"  - **{TOPIC_LABELS[name][topic_id]}**: {prob:.2%}")
@@ -0,0 +1,89 @@
+# Client for inference_service.py, used by the Streamlit pages.
+# Set INFERENCE_URL to point at a service on another host or port.
+import json
+import os
+import urllib.error
+import urllib.request
+
+INFERENCE_URL = os.environ.get('INFERENCE_URL', 'http://127.0.0.1:8502')
+
+
+class InferenceClient:
+    def __init__(self, url=INFERENCE_URL, timeout=60):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, path, payload=None, timeout=None):
+        data = None if payload is None else json.dumps(payload).encode('utf-8')
+        request = urllib.request.Request(f"{self.url}{path}", data=data,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(json.loads(e.read()).get('error', str(e))) from e
+
+    def health(self):
+        return self._request('/health', timeout=1)
+
+    def metrics(self):
+        return self._request('/metrics')
+
+    def is_available(self):
+        try:
+            return self.health().get('status') == 'ok'
+        except (OSError, ValueError):
+            return False
+
+    def score(self, text, model='jelek'):
+        # Returns {'model', 'processed', 'topics': [{'id', 'label', 'probability'}] or None}
+        return self._request('/score', {'text': text, 'model': model})
+
+    def score_many(self, texts, model='jelek'):
+        return self._request('/score', {'texts': list(texts), 'model': model})['results']
+
+    def score_dual(self, text, rating=None):
+        # Adds 'polarity', 'polarity_source' and per-model 'models' to the score result
+        return self._request('/score', {'text': text, 'model': 'dual', 'rating': rating})
+
+
+client = InferenceClient()
+
+
+def score_review(text, model='jelek'):
+    """
+    Score one review through the inference service, or in this process if
+    the service is not running.
+
+    Returns:
+        tuple: (processed review, [(topic_id, probability), ...] or None)
+    """
+    if client.is_available():
+        result = client.score(text, model)
+        topics = result['topics']
+        return result['processed'], topics and [(topic['id'], topic['probability']) for topic in topics]
+
+    from bulk_scoring import score_single
+    return score_single(text, model)
+
+
+def score_review_dual(text, rating=None):
+    """
+    Score one review against both models, through the inference service or
+    in this process if the service is not running.
+
+    Returns:
+        tuple: (processed review, dual_scoring.score_processed result or None)
+    """
+    if client.is_available():
+        result = client.score_dual(text, rating)
+        if result['topics'] is None:
+            return result['processed'], None
+        models = {name: {'topics': [(topic['id'], topic['probability']) for topic in entry['topics']],
+                         'log_likelihood': entry['log_likelihood']}
+                  for name, entry in result['models'].items()}
+        return result['processed'], {'polarity': result['polarity'],
+                                     'polarity_source': result['polarity_source'], 'models': models}
+
+    from dual_scoring import score_dual
+    return score_dual([text], [rating])[0]
@@ -0,0 +1,255 @@
+# Local HTTP topic inference service with micro-batching.
+# Concurrent requests are collected for a few milliseconds and scored together.
+# Run from the deployment folder:
+#   python inference_service.py --port 8502
+# Endpoints:
+#   POST /score    {"text": "..."} or {"texts": [...]}, optional "model": "jelek" | "bagus" | "dual"
+#                  and, for "dual", optional "rating" / "ratings" used for routing
+#   GET  /health
+#   GET  /metrics
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import prepro_script
+from dual_scoring import score_processed
+from model_registry import MODEL_NAMES, TOPIC_LABELS, get_engine
+from topic_cache import cached_topic_probabilities, topic_cache
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+def score_batch(items):
+    """
+    Preprocess a micro-batch once, then score each model's share in one inference call.
+
+    Args:
+        items (list): (text, model name, rating) triples; model 'dual' scores
+            against every model and routes by rating or predicted polarity.
+
+    Returns:
+        list: One result dict per item, in order.
+    """
+    processed = prepro_script.text_preprocessing_batch([text for text, _, _ in items])
+    results = [{'model': model, 'processed': text, 'topics': None} for text, (_, model, _) in zip(processed, items)]
+
+    for model in {model for _, model, _ in items}:
+        indices = [i for i, (_, name, _) in enumerate(items) if name == model and processed[i]]
+        if not indices:
+            continue
+
+        if model == 'dual':
+            dual = score_processed([processed[i] for i in indices], [items[i][2] for i in indices])
+            for i, scores in zip(indices, dual):
+                models = {name: {'topics': topic_entries(name, entry['topics']),
+                                 'log_likelihood': entry['log_likelihood']}
+                          for name, entry in scores['models'].items()}
+                results[i].update(polarity=scores['polarity'], polarity_source=scores['polarity_source'],
+                                  models=models, topics=models[scores['polarity']]['topics'])
+            continue
+
+        engine = get_engine(model)
+        probabilities = cached_topic_probabilities(model, [engine.doc2bow(processed[i].split()) for i in indices])
+        for i, row in zip(indices, probabilities):
+            results[i]['topics'] = topic_entries(model, enumerate(row))
+    return results
+
+
+def topic_entries(model, topics):
+    labels = TOPIC_LABELS[model]
+    return [{'id': topic_id, 'label': labels[topic_id], 'probability': float(prob)} for topic_id, prob in topics]
+
+
+class MicroBatcher:
+    """
+    Queue of pending items drained in batches of up to max_batch, waiting at
+    most max_wait seconds for a batch to fill. Batches run one at a time in a
+    worker thread so the event loop keeps accepting requests.
+    """
+
+    def __init__(self, handler, max_batch=64, max_wait=0.005, latency_window=1000):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.started = time.time()
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.max_batch_seen = 0
+        self.latencies = deque(maxlen=latency_window)
+        self._task = None
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await loop.run_in_executor(self.executor, self.handler, [item for item, _, _ in batch])
+            except Exception as e:
+                self.errors += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            self.batches += 1
+            self.items += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            for (_, future, queued), result in zip(batch, results):
+                self.latencies.append(now - queued)
+                if not future.done():
+                    future.set_result(result)
+
+    def metrics(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'items': self.items,
+            'batches': self.batches,
+            'errors': self.errors,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_seen,
+            'queue_depth': self.queue.qsize() if self.queue else 0,
+            'latency_ms_p50': percentile(0.50),
+            'latency_ms_p95': percentile(0.95),
+            'latency_ms_max': latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+
+class InferenceService:
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self.requests = 0
+
+    async def handle_score(self, body):
+        if not isinstance(body, dict):
+            return 400, {'error': "Expected a JSON object"}
+        model = body.get('model', 'jelek')
+        if model not in TOPIC_LABELS and model != 'dual':
+            return 400, {'error': f"Unknown model {model!r}; expected one of {list(TOPIC_LABELS) + ['dual']}"}
+        texts = body['texts'] if 'texts' in body else [body.get('text')]
+        # A string 'texts' would otherwise be scored one character at a time
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return 400, {'error': "'text' must be a string and 'texts' a list of strings"}
+        ratings = body['ratings'] if 'ratings' in body else [body.get('rating')] * len(texts)
+        if not isinstance(ratings, list) or len(ratings) != len(texts) or not all(r is None or isinstance(r, (int, float)) for r in ratings):
+            return 400, {'error': "'ratings' must hold one number (or null) per text"}
+
+        results = await asyncio.gather(*(self.batcher.submit((text, model, rating))
+                                         for text, rating in zip(texts, ratings)))
+        if 'texts' in body:
+            return 200, {'results': results}
+        return 200, results[0]
+
+    async def route(self, method, path, body):
+        if path == '/health':
+            return 200, {'status': 'ok', 'models': list(MODEL_NAMES)}
+        if path == '/metrics':
+            return 200, dict(self.batcher.metrics(), requests=self.requests, topic_cache=topic_cache.stats())
+        if path == '/score':
+            if method != 'POST':
+                return 405, {'error': "Use POST"}
+            return await self.handle_score(body)
+        return 404, {'error': f"No endpoint {path}"}
+
+    async def handle_connection(self, reader, writer):
+        # Minimal HTTP/1.1: one JSON request per connection
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                key, _, value = line.partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+            if len(request_line) < 2:
+                status, payload = 400, {'error': "Malformed request line"}
+            else:
+                method, path = request_line[0], request_line[1].split('?')[0]
+                try:
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError(f"negative Content-Length {length}")
+                    body = json.loads(await reader.readexactly(length)) if length else {}
+                    self.requests += 1
+                    status, payload = await self.route(method, path, body)
+                except (ValueError, KeyError, asyncio.IncompleteReadError) as e:
+                    status, payload = 400, {'error': f"Invalid request body: {e}"}
+                except Exception as e:
+                    status, payload = 500, {'error': str(e)}
+
+            data = json.dumps(payload).encode('utf-8')
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1') + data
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(host, port, max_batch, max_wait):
+    batcher = MicroBatcher(score_batch, max_batch=max_batch, max_wait=max_wait)
+    batcher.start()
+    service = InferenceService(batcher)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Inference service on http://{host}:{port} (max batch {max_batch}, window {max_wait * 1000:.0f} ms)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching topic inference service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    from translation import add_translator_args, make_translator
+    add_translator_args(parser)
+    args = parser.parse_args()
+
+    worker = make_translator(args)
+    if worker is not None:
+        prepro_script.preprocessor.translation_worker = worker
+
+    # Load everything before the first request; inference runs on the NumPy engines, without gensim
+    prepro_script.warmup()
+    for name in MODEL_NAMES:
+        get_engine(name)
+
+    asyncio.run(serve(args.host, args.port, args.max_batch, args.max_wait_ms / 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+# Cached, typed snapshots of the labeled review CSVs used by the Analysis pages.
+# Each CSV is parsed once into a Parquet snapshot next to it (company, province
+# and topic as categoricals, rating as nullable Int8, parsed_date as datetime),
+# and the loaded frame is shared by every session in the process until the CSV
+# changes.
+# A topic cube (topic_cube.py) and the n-gram index (ngram_index.py) are
+# refreshed alongside each frame.
+# Compare parse time and memory with: python labeled_store.py [csv ...]
+import os
+import sys
+import threading
+import time
+import pandas as pd
+from ngram_index import load_index as load_ngram_index
+from topic_cube import TopicCube
+
+CATEGORICAL_COLUMNS = ['company', 'province', 'topic']
+CUBE_COLUMNS = ['company', 'province', 'topic', 'parsed_date']
+NGRAM_COLUMNS = ['company', 'province', 'topic', 'processed_reviews']
+
+
+def snapshot_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def read_typed_csv(csv_path):
+    # Parse the CSV and convert its columns to the snapshot's compact types
+    df = pd.read_csv(csv_path)
+    for column in CATEGORICAL_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype('category')
+    if 'rating' in df:
+        # Missing or non-numeric ratings become <NA>; the rows are kept for the topic counts
+        rating = pd.to_numeric(df['rating'], errors='coerce')
+        invalid = int((rating.isna() & df['rating'].notna()).sum())
+        if invalid:
+            print(f"{csv_path}: {invalid} non-numeric ratings read as missing")
+        df['rating'] = rating.astype('Int8')
+    if 'parsed_date' in df:
+        df['parsed_date'] = pd.to_datetime(df['parsed_date'], errors='coerce')
+    return df
+
+
+def is_stale(csv_path, path=None):
+    path = path or snapshot_path(csv_path)
+    return not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(csv_path)
+
+
+def build_snapshot(csv_path, path=None):
+    path = path or snapshot_path(csv_path)
+    df = read_typed_csv(csv_path)
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return df
+
+
+def read_snapshot(csv_path):
+    # Rebuild the snapshot if it is missing or older than the CSV; without pyarrow, parse the CSV
+    path = snapshot_path(csv_path)
+    try:
+        if is_stale(csv_path, path):
+            print(f"Snapshot {path} is missing or stale; building it from {csv_path}")
+            return build_snapshot(csv_path, path)
+        return pd.read_parquet(path)
+    except ImportError:
+        return read_typed_csv(csv_path)
+
+
+class LabeledStore:
+    """
+    Process-wide cache of labeled document frames, keyed by CSV path.
+
+    A frame is reloaded only when its CSV's modification time or size
+    changes; its topic cube and n-gram index are refreshed with it. Frames
+    are shared between sessions: filter or copy them, never modify them in
+    place.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache = {}
+        self.load_seconds = {}
+
+    def _entry(self, csv_path):
+        # (stamp, frame, cube, n-gram index) for the CSV's current version
+        key = os.path.abspath(csv_path)
+        stat = os.stat(key)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._cache.get(key)
+        if cached is None or cached[0] != stamp:
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is None or cached[0] != stamp:
+                    start = time.perf_counter()
+                    df = read_snapshot(key)
+                    cube = TopicCube(df) if all(column in df for column in CUBE_COLUMNS) else None
+                    index = load_ngram_index(key, df) if all(column in df for column in NGRAM_COLUMNS) else None
+                    cached = self._cache[key] = (stamp, df, cube, index)
+                    self.load_seconds[key] = time.perf_counter() - start
+        return cached
+
+    def get(self, csv_path):
+        return self._entry(csv_path)[1]
+
+    def version(self, csv_path):
+        # (mtime_ns, size) of the loaded CSV; changes whenever its frame is refreshed
+        return self._entry(csv_path)[0]
+
+    def cube(self, csv_path):
+        cube = self._entry(csv_path)[2]
+        if cube is None:
+            raise ValueError(f"{csv_path} needs {', '.join(CUBE_COLUMNS)} columns for a topic cube")
+        return cube
+
+    def ngrams(self, csv_path):
+        index = self._entry(csv_path)[3]
+        if index is None:
+            raise ValueError(f"{csv_path} needs {', '.join(NGRAM_COLUMNS)} columns for an n-gram index")
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.load_seconds.clear()
+
+
+store = LabeledStore()
+
+
+def load_labeled(csv_path):
+    return store.get(csv_path)
+
+
+def load_topic_cube(csv_path):
+    return store.cube(csv_path)
+
+
+def load_ngrams(csv_path):
+    return store.ngrams(csv_path)
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def compare(csv_path, runs=5):
+    """
+    Parse time and memory of pd.read_csv against the cached snapshot.
+
+    Returns:
+        dict: Seconds and MB for the plain CSV parse, a snapshot read and a cache hit.
+    """
+    def best_of(func):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    build_snapshot(csv_path)
+    csv_seconds, plain = best_of(lambda: pd.read_csv(csv_path))
+    snapshot_seconds, typed = best_of(lambda: pd.read_parquet(snapshot_path(csv_path)))
+    store.get(csv_path)
+    cached_seconds, _ = best_of(lambda: store.get(csv_path))
+    return {
+        'csv_seconds': csv_seconds, 'csv_mb': memory_mb(plain),
+        'snapshot_seconds': snapshot_seconds, 'snapshot_mb': memory_mb(typed),
+        'cached_seconds': cached_seconds,
+        'csv_bytes': os.path.getsize(csv_path), 'snapshot_bytes': os.path.getsize(snapshot_path(csv_path)),
+    }
+
+
+if __name__ == '__main__':
+    for csv_path in sys.argv[1:] or ['labeled_documents.csv', 'bagus_labeled_documents.csv']:
+        if not os.path.exists(csv_path):
+            print(f"{csv_path}: not found")
+            continue
+        result = compare(csv_path)
+        print(f"{csv_path} ({result['csv_bytes'] / 1e6:.1f} MB CSV, {result['snapshot_bytes'] / 1e6:.1f} MB Parquet)")
+        print(f"  pd.read_csv     {result['csv_seconds'] * 1000:7.1f} ms  {result['csv_mb']:6.1f} MB in memory")
+        print(f"  Parquet load    {result['snapshot_seconds'] * 1000:7.1f} ms  {result['snapshot_mb']:6.1f} MB in memory")
+        print(f"  cached (rerun)  {result['cached_seconds'] * 1000:7.3f} ms")
@@ -0,0 +1,104 @@
+# Compiled lexicon: slang, stopword and exception tables fused into one
+# token -> action table, saved as a single pickle next to the models.
+# Build it with: python lexicon.py
+import json
+import os
+import pickle
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEXICON_PATH = os.path.join(BASE_DIR, 'model_dicts', 'lexicon.pkl')
+JSON_DIR = os.path.join(BASE_DIR, 'JSONs')
+SOURCE_FILES = ['slang_bank.json', 'expand_stopwords.json', 'exception_words.json']
+
+# Bump when the artifact layout changes so older pickles are recompiled
+LEXICON_VERSION = 3
+
+
+def load_sources(json_dir=JSON_DIR):
+    # The NLTK corpus is only needed when compiling, not when loading the artifact
+    from nltk.corpus import stopwords
+
+    with open(os.path.join(json_dir, 'slang_bank.json'), 'r') as file:
+        slang_dict = json.load(file)
+
+    with open(os.path.join(json_dir, 'exception_words.json'), 'r') as file:
+        exception_words = set(json.load(file)["exception_words"])
+
+    with open(os.path.join(json_dir, 'expand_stopwords.json'), 'r') as f:
+        custom_stopwords = json.load(f).get("expand_stopwords", [])
+    if not isinstance(custom_stopwords, list):
+        raise ValueError("The 'expand_stopwords' key must contain a list.")
+
+    stpwds_id = set(stopwords.words('indonesian'))
+    stpwds_id.update(custom_stopwords)
+    return slang_dict, stpwds_id, exception_words
+
+
+def compile_lexicon(slang_dict, stpwds_id, exception_words):
+    """
+    Fuse slang replacement and stopword removal into one table.
+
+    Returns:
+        dict: token -> replacement (str) or None to drop it. Tokens that are
+        not in the table are kept unchanged.
+    """
+    table = {}
+
+    # Stopwords are checked after slang replacement, so slang keys take precedence
+    for word in stpwds_id:
+        if word not in exception_words:
+            table[word] = None
+
+    for word, replacement in slang_dict.items():
+        if replacement in stpwds_id and replacement not in exception_words:
+            table[word] = None
+        else:
+            table[word] = replacement
+
+    # Drop identity entries; absent tokens are kept as they are
+    return {word: action for word, action in table.items() if action != word}
+
+
+def apply_lexicon(tokens, table):
+    # One lookup per token replaces the slang and stopword passes
+    result = []
+    for word in tokens:
+        word = table.get(word, word)
+        if word is not None:
+            result.append(word)
+    return result
+
+
+def build_lexicon(path=LEXICON_PATH, json_dir=JSON_DIR):
+    table = compile_lexicon(*load_sources(json_dir))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'version': LEXICON_VERSION, 'table': table}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return table
+
+
+def is_stale(path=LEXICON_PATH, json_dir=JSON_DIR):
+    if not os.path.exists(path):
+        return True
+    built = os.path.getmtime(path)
+    return any(os.path.getmtime(os.path.join(json_dir, name)) > built for name in SOURCE_FILES)
+
+
+def load_lexicon(path=LEXICON_PATH, json_dir=JSON_DIR):
+    # Fall back to compiling from the JSON sources if the artifact is missing, older or an old layout
+    if is_stale(path, json_dir):
+        print(f"Lexicon artifact {path} is missing or stale; compiling from {json_dir}")
+        return compile_lexicon(*load_sources(json_dir))
+    with open(path, 'rb') as f:
+        lexicon = pickle.load(f)
+    if not isinstance(lexicon, dict) or lexicon.get('version') != LEXICON_VERSION:
+        print(f"Lexicon artifact {path} has an old layout; compiling from {json_dir}")
+        return compile_lexicon(*load_sources(json_dir))
+    return lexicon['table']
+
+
+if __name__ == '__main__':
+    table = build_lexicon()
+    dropped = sum(action is None for action in table.values())
+    print(f"Wrote {LEXICON_PATH}: {len(table)} entries ({dropped} drop, {len(table) - dropped} replace)")
@@ -0,0 +1,88 @@
+# Thread-safe bounded LRU cache with hit/miss counters, shared by the stem,
+# topic distribution and word cloud caches. Each of those only adds its own
+# key building and, for stems, saving to and loading from disk.
+import threading
+from collections import OrderedDict
+
+
+class LruCache:
+    """
+    Bounded mapping that evicts the least recently used entries.
+
+    Values are computed outside the lock, so a slow miss never blocks hits;
+    two threads missing the same key may both compute it, and the last one
+    stored wins.
+
+    Args:
+        maxsize (int): Maximum number of cached entries.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, compute):
+        # Cached value for key, calling compute() to create it on a miss
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        value = compute()
+        self.put_many([(key, value)])
+        return value
+
+    def get_many(self, keys):
+        """
+        Look up many keys under one lock, counting a hit or miss per key.
+
+        Returns:
+            dict: key -> value for the keys that were cached.
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+            self.hits += sum(key in found for key in keys)
+            self.misses += sum(key not in found for key in keys)
+        return found
+
+    def put_many(self, items):
+        # Store (key, value) pairs as the most recently used, then evict down to maxsize
+        with self._lock:
+            for key, value in items:
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self):
+        # (key, value) pairs from least to most recently used
+        with self._lock:
+            return list(self._data.items())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,201 @@
+# Process-wide model registry: each LDA model, dictionary and corpus is loaded
+# at most once per Python process and shared by every Streamlit session.
+import glob
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, 'model_dicts')
+
+# Model families saved by the notebook: jelek (bad reviews) and bagus (good reviews)
+MODEL_NAMES = ('jelek', 'bagus')
+
+# Topic labels shown on the Inference page
+TOPIC_LABELS = {
+    'jelek': {0: "Pelayan Buruk", 1: "Delay / Lambat", 2: "Miskomunikasi Kurir"},
+    'bagus': {0: "Pelayanan Bagus", 1: "Kantor Cabang", 2: "Respon Staff"},
+}
+
+# The notebook's names for the same topics, written to the labeled CSVs that the
+# Analysis pages filter on; labels not listed here are the same in both
+DASHBOARD_LABELS = {
+    "Pelayan Buruk": "Kualitas Pelayan Buruk",
+    "Delay / Lambat": "Delay/ Lambat Pengiriman",
+    "Miskomunikasi Kurir": "Komunikasi Kurir",
+}
+
+
+def dashboard_label(name, topic_id):
+    # Label a labeled CSV row gets for a model's topic
+    label = TOPIC_LABELS[name][topic_id]
+    return DASHBOARD_LABELS.get(label, label)
+
+
+class ModelRegistry:
+    """
+    Lazily loads and caches the saved LDA artifacts.
+
+    Models are loaded with mmap='r', so the expElogbeta.npy arrays are
+    memory-mapped read-only and worker processes share one physical copy
+    through the page cache. Corpora are only unpickled when asked for.
+
+    The live model, dictionary and corpus are read from the version named in
+    versions/<name>/current (written by update_model.promote), or from
+    model_dir itself before any version is promoted. The folder is pinned when
+    the first artifact of a model loads, so a promotion between two loads
+    never pairs a new model with an old dictionary; refresh() moves to the
+    new version.
+
+    Args:
+        model_dir (str): Folder with the <name>_lda_* files.
+        mmap (str or None): Passed to LdaModel.load; None loads private copies,
+            e.g. for training updates.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, mmap='r'):
+        self.model_dir = model_dir
+        self.mmap = mmap
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._versions = {}
+        self._dirs = {}
+        self._engine_stamps = {}
+        self.load_seconds = {}
+
+    def current_path(self, name):
+        # Pointer file holding the name of the promoted version
+        return os.path.join(self.model_dir, 'versions', name, 'current')
+
+    def artifact_dir(self, name):
+        # Folder the live model, dictionary and corpus are read from
+        try:
+            with open(self.current_path(name), 'r') as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return self.model_dir
+        return os.path.join(self.model_dir, 'versions', name, version)
+
+    def path(self, name, kind, directory=None):
+        # The engine export always lives in model_dir; it records the version it was built from
+        suffix = {'model': 'lda_model.model', 'dictionary': 'lda_dictionary.dict', 'corpus': 'lda_corpus.pkl',
+                  'engine': 'lda_engine.npz'}[kind]
+        if kind == 'engine':
+            directory = self.model_dir
+        return os.path.join(directory or self.artifact_dir(name), f'{name}_{suffix}')
+
+    def _get(self, name, kind, loader):
+        key = (name, kind)
+        if key not in self._cache:
+            with self._lock:
+                if key not in self._cache:
+                    directory = self._dirs.setdefault(name, self.artifact_dir(name))
+                    self._versions.setdefault(name, self.version(name, directory))
+                    start = time.perf_counter()
+                    self._cache[key] = loader(self.path(name, kind, directory))
+                    self.load_seconds[key] = time.perf_counter() - start
+        return self._cache[key]
+
+    def lda_model(self, name):
+        from gensim.models import LdaModel
+        return self._get(name, 'model', lambda path: LdaModel.load(path, mmap=self.mmap))
+
+    def dictionary(self, name):
+        from gensim.corpora import Dictionary
+        return self._get(name, 'dictionary', Dictionary.load)
+
+    def engine(self, name):
+        # NumPy inference engine exported from the model; serving needs no gensim import
+        from numpy_lda import load_engine
+
+        def load(path):
+            # load_engine may rewrite the file, so stamp it after loading
+            engine = load_engine(name, self.model_dir)
+            self._engine_stamps[name] = self.engine_stamp(name)
+            return engine
+        return self._get(name, 'engine', load)
+
+    def corpus(self, name):
+        # Training corpus; only needed for validation and coherence, never for inference
+        def load(path):
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        return self._get(name, 'corpus', load)
+
+    def version(self, name, directory=None):
+        # Changes whenever another version is promoted or any of the model's or dictionary's files is rewritten
+        directory = directory or self.artifact_dir(name)
+        paths = sorted(glob.glob(self.path(name, 'model', directory) + '*')) + [self.path(name, 'dictionary', directory)]
+        stamps = []
+        for path in paths:
+            stat = os.stat(path)
+            stamps.append(f"{os.path.relpath(path, self.model_dir)}:{stat.st_mtime_ns}:{stat.st_size}")
+        return hashlib.sha1('|'.join(stamps).encode('utf-8')).hexdigest()[:12]
+
+    def engine_stamp(self, name):
+        # The engine .npz is not part of version(): the export records version() as its source
+        path = self.path(name, 'engine')
+        if not os.path.exists(path):
+            return 'none'
+        stat = os.stat(path)
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def refresh(self, name):
+        """
+        Drop a model's loaded artifacts if its files changed or another
+        version was promoted since loading.
+
+        The engine is also dropped on its own when its .npz is rewritten,
+        e.g. by a re-export with other settings.
+
+        Returns:
+            str: Current model version and engine stamp, for cache keys.
+        """
+        version = self.version(name)
+        engine_stamp = self.engine_stamp(name)
+        with self._lock:
+            if self._versions.get(name, version) != version:
+                for kind in ('model', 'dictionary', 'corpus', 'engine'):
+                    self._cache.pop((name, kind), None)
+                    self.load_seconds.pop((name, kind), None)
+                self._dirs.pop(name, None)
+            elif self._engine_stamps.get(name, engine_stamp) != engine_stamp:
+                self._cache.pop((name, 'engine'), None)
+                self.load_seconds.pop((name, 'engine'), None)
+            self._versions[name] = version
+            if (name, 'engine') not in self._cache:
+                self._engine_stamps.pop(name, None)
+        return f"{version}-{engine_stamp}"
+
+    def loaded(self):
+        return sorted(self._cache)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._versions.clear()
+            self._dirs.clear()
+            self._engine_stamps.clear()
+            self.load_seconds.clear()
+
+
+# Shared registry; module imports are cached per process, so every session sees it
+registry = ModelRegistry()
+
+
+def get_lda_model(name):
+    return registry.lda_model(name)
+
+
+def get_dictionary(name):
+    return registry.dictionary(name)
+
+
+def get_engine(name):
+    return registry.engine(name)
+
+
+def get_corpus(name):
+    return registry.corpus(name)
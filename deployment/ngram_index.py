@@ -0,0 +1,305 @@
+# Word, bigram and trigram counts per (company, province, topic), built offline
+# from a labeled CSV and saved next to it as <csv>_ngrams.npz. Cells can be
+# merged for any selection ("All Provinces", several topics), so the Analysis
+# pages read their frequency tables without touching the review text.
+# Build or rebuild and compare with the Counter scans: python ngram_index.py [csv ...]
+import os
+import sys
+import numpy as np
+import pandas as pd
+import scipy.sparse as sps
+from artifacts import check_layout, decode_strings, encode_strings, is_current, save_npz
+from tokenizer import fast_word_tokenize, ngrams
+
+# .npz layout version, see artifacts.is_current
+INDEX_VERSION = 2
+
+ORDERS = (1, 2, 3)
+# Terms kept per saved top-k summary; larger requests merge the cells
+TOP_K = 50
+
+
+def index_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '_ngrams.npz'
+
+
+def review_terms(text):
+    """
+    Terms of one processed review per n-gram order, as the Analysis page counts them.
+
+    Words are whitespace-split, as in its word frequency table; bigrams and
+    trigrams come from fast_word_tokenize, as in its n-gram tables.
+
+    Returns:
+        dict: order -> list of space-joined terms.
+    """
+    tokens = fast_word_tokenize(text)
+    terms = {1: text.split()}
+    for n in ORDERS[1:]:
+        terms[n] = [' '.join(gram) for gram in ngrams(tokens, n)]
+    return terms
+
+
+class NgramIndex:
+    """
+    Sparse term counts per cell, one matrix per n-gram order.
+
+    Args:
+        companies, provinces, topics (list): Category labels; cell keys are codes into them.
+        cells (numpy.ndarray): (cells, 3) company, province and topic codes;
+            province -1 marks reviews without a province and topic -1 reviews
+            without a topic, which count towards company and province totals
+            (as in TopicCube.review_count) but match no topic selection.
+        vocab (dict): order -> list of terms; term i is column i of counts[order].
+        counts (dict): order -> (cells, vocabulary) scipy.sparse.csr_matrix.
+        first (dict): order -> matrix with the same layout as counts holding
+            (terms in the CSV) - (offset of the term's first occurrence in the
+            cell), so the largest value over merged cells marks the earliest.
+        summary (dict): Precomputed top terms, see summarize(); built if None.
+    """
+
+    def __init__(self, companies, provinces, topics, cells, vocab, counts, first, summary=None):
+        self.companies = list(companies)
+        self.provinces = list(provinces)
+        self.topics = list(topics)
+        self.cells = np.asarray(cells, dtype=np.int64).reshape(-1, 3)
+        self.vocab = vocab
+        self.counts = {n: matrix.tocsr() for n, matrix in counts.items()}
+        self.first = {n: matrix.tocsr() for n, matrix in first.items()}
+        self._company_index = {name: i for i, name in enumerate(self.companies)}
+        self._province_index = {name: i for i, name in enumerate(self.provinces)}
+        self._topic_index = {name: i for i, name in enumerate(self.topics)}
+        self.summary = self.summarize() if summary is None else summary
+
+    @classmethod
+    def build(cls, df):
+        company = pd.Categorical(df['company'])
+        province = pd.Categorical(df['province'])
+        topic = pd.Categorical(df['topic'])
+        texts = df['processed_reviews'].fillna('').astype(str)
+
+        cell_ids = {}
+        term_ids = {n: {} for n in ORDERS}
+        entries = {n: ([], [], []) for n in ORDERS}
+        for c, p, t, text in zip(company.codes, province.codes, topic.codes, texts):
+            if c < 0:
+                continue
+            cell = cell_ids.setdefault((int(c), int(p), int(t)), len(cell_ids))
+            for n, terms in review_terms(text).items():
+                ids = term_ids[n]
+                rows, cols, positions = entries[n]
+                # Offsets run across the whole CSV, in the order a Counter would see the terms
+                positions.extend(range(len(rows), len(rows) + len(terms)))
+                rows.extend([cell] * len(terms))
+                cols.extend(ids.setdefault(term, len(ids)) for term in terms)
+
+        counts, first = {}, {}
+        for n in ORDERS:
+            rows, cols, positions = (np.array(values, dtype=np.int64) for values in entries[n])
+            # One entry per (cell, term): its number of occurrences and earliest offset
+            order = np.lexsort((positions, cols, rows))
+            rows, cols, positions = rows[order], cols[order], positions[order]
+            starts = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])])
+            occurrences = np.diff(np.r_[starts, len(rows)]).astype(np.int32)
+            shape = (len(cell_ids), len(term_ids[n]))
+            counts[n] = sps.csr_matrix((occurrences, (rows[starts], cols[starts])), shape=shape)
+            first[n] = sps.csr_matrix(((len(rows) - positions[starts]).astype(np.int32), (rows[starts], cols[starts])),
+                                      shape=shape)
+        vocab = {n: list(term_ids[n]) for n in ORDERS}
+        return cls(company.categories, province.categories, topic.categories, list(cell_ids), vocab, counts, first)
+
+    def save(self, path, source_version=''):
+        arrays = {
+            'index_version': INDEX_VERSION,
+            'source_version': source_version,
+            'companies': encode_strings(self.companies),
+            'provinces': encode_strings(self.provinces),
+            'topics': encode_strings(self.topics),
+            'cells': self.cells,
+        }
+        # Summaries as fixed-width rows, padded with id -1
+        keys = sorted(self.summary)
+        arrays['summary_keys'] = np.array(keys, dtype=np.int64).reshape(-1, 3)
+        arrays['summary_ids'] = np.full((len(keys), TOP_K), -1, dtype=np.int64)
+        arrays['summary_counts'] = np.zeros((len(keys), TOP_K), dtype=np.int64)
+        for row, key in enumerate(keys):
+            ids, counts = self.summary[key]
+            arrays['summary_ids'][row, :len(ids)] = ids
+            arrays['summary_counts'][row, :len(ids)] = counts
+        for n in ORDERS:
+            matrix = self.counts[n]
+            arrays.update({
+                f'vocab{n}': encode_strings(self.vocab[n]),
+                f'data{n}': matrix.data, f'indices{n}': matrix.indices, f'indptr{n}': matrix.indptr,
+                f'first{n}': self.first[n].data,
+                f'shape{n}': np.array(matrix.shape),
+            })
+        save_npz(path, compressed=True, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            check_layout(data, 'index_version', INDEX_VERSION, path)
+            vocab, counts, first = {}, {}, {}
+            for n in ORDERS:
+                vocab[n] = decode_strings(data[f'vocab{n}'])
+                layout = (data[f'indices{n}'], data[f'indptr{n}'])
+                counts[n] = sps.csr_matrix((data[f'data{n}'],) + layout, shape=tuple(data[f'shape{n}']))
+                first[n] = sps.csr_matrix((data[f'first{n}'],) + layout, shape=tuple(data[f'shape{n}']))
+            summary = {}
+            for key, ids, top_counts in zip(data['summary_keys'], data['summary_ids'], data['summary_counts']):
+                size = int(np.count_nonzero(ids >= 0))
+                summary[tuple(int(value) for value in key)] = (ids[:size], top_counts[:size])
+            return cls(decode_strings(data['companies']), decode_strings(data['provinces']), decode_strings(data['topics']),
+                       data['cells'], vocab, counts, first, summary)
+
+    def _rows(self, company, province=None, topics=None):
+        # Cells in the selection; province None merges all provinces
+        c = self._company_index.get(company)
+        mask = self.cells[:, 0] == (-2 if c is None else c)
+        if province is not None:
+            p = self._province_index.get(province)
+            mask &= self.cells[:, 1] == (-2 if p is None else p)
+        if topics is not None:
+            codes = [self._topic_index[topic] for topic in topics if topic in self._topic_index]
+            mask &= np.isin(self.cells[:, 2], codes)
+        return np.flatnonzero(mask)
+
+    def _top_ids(self, rows, n, size):
+        # Ids and counts of the size most frequent terms over the given cells, in Counter order
+        counts = np.asarray(self.counts[n][rows].sum(axis=0)).ravel()
+        size = min(size, np.count_nonzero(counts))
+        if size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        # Every term tied with the size-th count is a candidate; ties go to the earliest occurrence
+        threshold = np.partition(counts, len(counts) - size)[len(counts) - size]
+        candidates = np.flatnonzero(counts >= threshold)
+        first = self.first[n][rows]
+        earliest = np.zeros(len(counts), dtype=np.int64)
+        np.maximum.at(earliest, first.indices, first.data)
+        candidates = candidates[np.lexsort((-earliest[candidates], -counts[candidates]))][:size]
+        return candidates, counts[candidates]
+
+    def summarize(self, size=TOP_K):
+        """
+        Top terms of every company, per province and over all provinces.
+
+        Returns:
+            dict: (company code, province code, order) -> (term ids, counts);
+                province code len(provinces) is "All Provinces".
+        """
+        summary = {}
+        all_provinces = len(self.provinces)
+        for c in np.unique(self.cells[:, 0]):
+            in_company = self.cells[:, 0] == c
+            for p in [all_provinces] + [p for p in np.unique(self.cells[in_company, 1]) if p >= 0]:
+                rows = np.flatnonzero(in_company if p == all_provinces else in_company & (self.cells[:, 1] == p))
+                for n in ORDERS:
+                    summary[(int(c), int(p), n)] = self._top_ids(rows, n, size)
+        return summary
+
+    def merged(self, company, province=None, n=1, topics=None):
+        """
+        Term counts summed over every cell in the selection.
+
+        Returns:
+            numpy.ndarray: Count per vocabulary entry of the given order.
+        """
+        rows = self._rows(company, province, topics)
+        return np.asarray(self.counts[n][rows].sum(axis=0)).ravel()
+
+    def frequencies(self, company, province=None, n=1, topics=None):
+        # Every term of the selection with its count, e.g. for WordCloud.generate_from_frequencies
+        counts = self.merged(company, province, n, topics)
+        terms = self.vocab[n]
+        return {terms[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def top(self, company, province=None, n=1, k=10, topics=None):
+        """
+        Most frequent terms of the selection, exactly as Counter.most_common(k)
+        over its reviews returns them, ties included (earliest occurrence first).
+
+        Company and province selections up to TOP_K terms come from the saved
+        summary; topic selections and larger k merge the cells.
+
+        Returns:
+            list: (word, count) for n=1, (n-gram tuple, count) otherwise.
+        """
+        if topics is None and k <= TOP_K:
+            c = self._company_index.get(company)
+            p = len(self.provinces) if province is None else self._province_index.get(province)
+            ids, counts = self.summary.get((c, p, n), ((), ()))
+        else:
+            ids, counts = self._top_ids(self._rows(company, province, topics), n, k)
+        terms = self.vocab[n]
+        return [(terms[i] if n == 1 else tuple(terms[i].split(' ')), int(count))
+                for i, count in zip(ids[:k], counts[:k])]
+
+
+def source_version(csv_path):
+    stat = os.stat(csv_path)
+    return f"{os.path.abspath(csv_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def build_index(csv_path, df=None, path=None):
+    path = path or index_path(csv_path)
+    if df is None:
+        df = pd.read_csv(csv_path)
+    index = NgramIndex.build(df)
+    index.save(path, source_version(csv_path))
+    return index
+
+
+def load_index(csv_path, df=None):
+    # Rebuild if the index is missing, built from another version of the CSV or an old layout
+    path = index_path(csv_path)
+    if is_current(path, 'index_version', INDEX_VERSION, source_version(csv_path)):
+        return NgramIndex.load(path)
+
+    print(f"N-gram index {path} is missing or stale; building it from {csv_path}")
+    return build_index(csv_path, df, path)
+
+
+def scan_top(df, company, province=None, k=10):
+    # The Analysis page's original Counter scans, kept as the reference for the check below
+    from collections import Counter
+
+    rows = df[df['company'] == company] if province is None else df[(df['company'] == company) & (df['province'] == province)]
+    texts = rows['processed_reviews'].fillna('').astype(str)
+    words = Counter(word for text in texts for word in text.split()).most_common(k)
+    grams = {n: Counter(gram for text in texts for gram in ngrams(fast_word_tokenize(text), n)).most_common(k)
+             for n in ORDERS[1:]}
+    return {1: words, **grams}
+
+
+if __name__ == '__main__':
+    import time
+
+    for csv_path in sys.argv[1:] or ['labeled_documents.csv', 'bagus_labeled_documents.csv']:
+        if not os.path.exists(csv_path):
+            print(f"{csv_path}: not found")
+            continue
+        df = pd.read_csv(csv_path)
+        start = time.perf_counter()
+        build_index(csv_path, df)
+        build_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        index = load_index(csv_path)
+        load_seconds = time.perf_counter() - start
+
+        filters = [(company, province) for company in index.companies for province in [None] + index.provinces]
+        start = time.perf_counter()
+        expected = [scan_top(df, company, province) for company, province in filters]
+        scan_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = [{n: index.top(company, province, n) for n in ORDERS} for company, province in filters]
+        index_seconds = time.perf_counter() - start
+
+        mismatches = sum(expected_top[n] != actual_top[n]
+                         for expected_top, actual_top in zip(expected, actual) for n in ORDERS)
+        print(f"{csv_path}: {len(index.cells)} cells, vocabulary "
+              f"{', '.join(str(len(index.vocab[n])) for n in ORDERS)} (1/2/3-grams); built in {build_seconds:.2f}s "
+              f"({os.path.getsize(index_path(csv_path)) / 1024:.0f} KiB), loaded in {load_seconds * 1000:.1f} ms")
+        print(f"  {len(filters)} filters: Counter scans {scan_seconds / len(filters) * 1e3:.1f} ms each, "
+              f"index {index_seconds / len(filters) * 1e3:.2f} ms each, {mismatches} of {len(filters) * len(ORDERS)} "
+              f"top-10 tables differ")
@@ -0,0 +1,369 @@
+# Gensim-free LDA inference. Serving only needs the variational E-step, so the
+# topic-word matrix, alpha and the dictionary's token ids are exported once to
+# a .npz and inference runs in plain NumPy, vectorized over a batch of documents.
+# Export and check parity with: python numpy_lda.py [jelek|bagus ...]
+# Compact exports: python numpy_lda.py --dtype float16 --keep-n 1000
+# Only the default settings replace the live engine; compact exports are
+# written to a scratch folder (--output-dir) for the drift report.
+import copy
+import glob
+import os
+import struct
+import tempfile
+import zipfile
+from collections import Counter
+import numpy as np
+from artifacts import check_layout, decode_strings, encode_strings, is_current, save_npz
+from model_registry import MODEL_DIR, MODEL_NAMES, ModelRegistry
+
+# .npz layout version, see artifacts.is_current
+ENGINE_VERSION = 3
+
+# Same normalizer guard as gensim's float32 models
+EPSILON = np.finfo(np.float32).eps
+
+_DIGAMMA_STEPS = np.arange(6.0)
+
+# Settings of the live serving engine: full precision, the model's whole vocabulary
+DEFAULT_SETTINGS = {'dtype': 'float32', 'no_below': None, 'no_above': None, 'keep_n': None}
+
+
+def engine_path(name, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f'{name}_lda_engine.npz')
+
+
+def memmap_member(path, key):
+    """
+    Memory-map one array of an uncompressed .npz without reading it.
+
+    np.load ignores mmap_mode for .npz archives, but np.savez stores each
+    .npy member as is, so the array bytes sit at a fixed offset in the file
+    and every process mapping them shares one copy through the page cache.
+
+    Returns:
+        numpy.memmap: Read-only array, or None if the member is compressed.
+    """
+    with open(path, 'rb') as f, zipfile.ZipFile(f) as archive:
+        info = archive.getinfo(f'{key}.npy')
+        if info.compress_type != zipfile.ZIP_STORED:
+            return None
+        # Local file header: 30 fixed bytes, then the name and extra field
+        f.seek(info.header_offset)
+        header = f.read(30)
+        name_length, extra_length = struct.unpack('<HH', header[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        major, _ = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if major == 1 else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape, order='F' if fortran_order else 'C')
+
+
+def digamma(x):
+    # psi(x) = psi(x + 6) - sum(1 / (x + i), i < 6), then the asymptotic series at x + 6;
+    # accurate to ~1e-10 for x > 0 with no per-element branching
+    x = np.asarray(x, dtype=np.float64)
+    shift = (1.0 / (x[..., None] + _DIGAMMA_STEPS)).sum(axis=-1)
+    x = x + 6
+    inv = 1.0 / x
+    inv2 = inv * inv
+    return (np.log(x) - 0.5 * inv - shift
+            - inv2 * (1.0 / 12 - inv2 * (1.0 / 120 - inv2 * (1.0 / 252 - inv2 * (1.0 / 240 - inv2 / 132)))))
+
+
+def dirichlet_expectation(gamma):
+    # E[log theta] for each row of gamma
+    return digamma(gamma) - digamma(gamma.sum(axis=1, keepdims=True))
+
+
+class NumpyLda:
+    """
+    Drop-in replacement for the inference side of gensim's LdaModel.
+
+    inference() runs the same fixed-point updates as LdaModel.inference, for
+    every document of the batch at once, until each document's mean gamma
+    change drops below gamma_threshold. Gamma starts at 1 (the mean of
+    gensim's random Gamma(100, 1/100) start), so results are deterministic.
+
+    Args:
+        exp_elog_beta (numpy.ndarray): (topics, words) exp(E[log beta]).
+        alpha (numpy.ndarray): Document-topic prior, one value per topic.
+        token2id (dict): Dictionary token -> word id.
+        topics (numpy.ndarray): (topics, words) normalized topic-word
+            probabilities, as returned by LdaModel.get_topics().
+    """
+
+    def __init__(self, exp_elog_beta, alpha, token2id, topics=None, iterations=50,
+                 gamma_threshold=0.001, minimum_probability=0.01):
+        # Kept in the exported dtype; inference upcasts to float64 as it goes
+        self.expElogbeta = np.asarray(exp_elog_beta)
+        self.alpha = np.asarray(alpha, dtype=np.float64)
+        self.token2id = token2id
+        self.topics = topics
+        self.iterations = iterations
+        self.gamma_threshold = gamma_threshold
+        self.minimum_probability = minimum_probability
+        self.num_topics = self.expElogbeta.shape[0]
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        # The topic-word matrices are memory-mapped read-only unless mmap is False
+        with np.load(path, allow_pickle=False) as data:
+            check_layout(data, 'engine_version', ENGINE_VERSION, path)
+            token2id = {token: token_id for token_id, token in enumerate(decode_strings(data['tokens']))}
+            matrices = {}
+            for key in ('expElogbeta', 'topics'):
+                matrices[key] = memmap_member(path, key) if mmap else None
+                if matrices[key] is None:
+                    matrices[key] = data[key]
+            return cls(matrices['expElogbeta'], data['alpha'], token2id, topics=matrices['topics'],
+                       iterations=int(data['iterations']), gamma_threshold=float(data['gamma_threshold']),
+                       minimum_probability=float(data['minimum_probability']))
+
+    def doc2bow(self, tokens):
+        # Same output as gensim's Dictionary.doc2bow: (id, count) sorted by id, unknown tokens dropped
+        counts = Counter(self.token2id[token] for token in tokens if token in self.token2id)
+        return sorted(counts.items())
+
+    def get_topics(self):
+        return self.topics
+
+    def inference(self, chunk):
+        """
+        Estimate gamma for every document of the chunk.
+
+        Returns:
+            tuple: ((documents, topics) gamma, None), like LdaModel.inference
+            without collect_sstats.
+        """
+        gamma = np.ones((len(chunk), self.num_topics))
+        if not len(chunk):
+            return gamma, None
+
+        # Pad documents to one (documents, words) block; padding has count 0 and adds nothing
+        width = max(len(doc) for doc in chunk)
+        ids = np.zeros((len(chunk), width), dtype=np.int64)
+        counts = np.zeros((len(chunk), width))
+        for d, doc in enumerate(chunk):
+            if doc:
+                ids[d, :len(doc)], counts[d, :len(doc)] = zip(*doc)
+        beta = self.expElogbeta[:, ids].transpose(1, 0, 2)
+
+        # Documents still iterating; converged ones are written back and dropped from the block
+        rows = np.arange(len(chunk))
+        current = gamma
+        exp_elog_theta = np.exp(dirichlet_expectation(current))
+        for _ in range(self.iterations):
+            phinorm = np.matmul(exp_elog_theta[:, None, :], beta)[:, 0, :] + EPSILON
+            new_gamma = self.alpha + exp_elog_theta * np.matmul(beta, (counts / phinorm)[:, :, None])[:, :, 0]
+            change = np.abs(new_gamma - current).mean(axis=1)
+            current = new_gamma
+            exp_elog_theta = np.exp(dirichlet_expectation(current))
+
+            # Same per-document stopping rule as gensim's loop
+            done = change < self.gamma_threshold
+            if done.any():
+                gamma[rows[done]] = current[done]
+                keep = ~done
+                rows, current, exp_elog_theta = rows[keep], current[keep], exp_elog_theta[keep]
+                beta, counts = beta[keep], counts[keep]
+                if not len(rows):
+                    break
+        gamma[rows] = current
+        return gamma, None
+
+    def topic_probabilities(self, bows):
+        gamma, _ = self.inference(bows)
+        return gamma / gamma.sum(axis=1, keepdims=True)
+
+    def get_document_topics(self, bow, minimum_probability=None):
+        if minimum_probability is None:
+            minimum_probability = self.minimum_probability
+        minimum_probability = max(minimum_probability, 1e-8)
+        probabilities = self.topic_probabilities([bow])[0]
+        return [(topic_id, float(prob)) for topic_id, prob in enumerate(probabilities) if prob >= minimum_probability]
+
+
+def prune_vocabulary(dictionary, no_below=None, no_above=None, keep_n=None):
+    """
+    Apply filter_extremes thresholds to a copy of the dictionary.
+
+    Returns:
+        list: Ids of the kept tokens in the original dictionary, ascending.
+    """
+    if no_below is None and no_above is None and keep_n is None:
+        return sorted(dictionary.token2id.values())
+    pruned = copy.deepcopy(dictionary)
+    pruned.filter_extremes(no_below=no_below or 1, no_above=1.0 if no_above is None else no_above, keep_n=keep_n)
+    return sorted(dictionary.token2id[token] for token in pruned.token2id)
+
+
+def export_engine(name, model_dir=MODEL_DIR, path=None, dtype='float32', no_below=None, no_above=None, keep_n=None):
+    """
+    Write a model's inference parameters and its dictionary's token ids to a .npz.
+
+    Args:
+        dtype (str): Storage type of the topic-word matrices, 'float32' or 'float16'.
+        no_below, no_above, keep_n: Optional filter_extremes thresholds; tokens
+            they drop are left out of the export and treated as unknown words.
+
+    Raises:
+        ValueError: If non-default settings would overwrite the live engine.
+
+    Returns:
+        str: Path of the written file.
+    """
+    path = path or engine_path(name, model_dir)
+    settings = {'dtype': dtype, 'no_below': no_below, 'no_above': no_above, 'keep_n': keep_n}
+    if os.path.abspath(path) == os.path.abspath(engine_path(name, model_dir)) and settings != DEFAULT_SETTINGS:
+        raise ValueError(f"{path} is the live inference engine; write non-default exports elsewhere")
+    registry = ModelRegistry(model_dir, mmap=None)
+    lda_model, dictionary = registry.lda_model(name), registry.dictionary(name)
+
+    # Kept tokens are renumbered 0..n-1 in original id order
+    kept = prune_vocabulary(dictionary, no_below, no_above, keep_n)
+    tokens = [dictionary[token_id] for token_id in kept]
+
+    # Stored uncompressed so NumpyLda.load can memory-map the matrices out of the archive
+    save_npz(
+        path,
+        engine_version=ENGINE_VERSION,
+        source_version=registry.version(name),
+        expElogbeta=lda_model.expElogbeta[:, kept].astype(dtype),
+        alpha=lda_model.alpha,
+        topics=lda_model.get_topics()[:, kept].astype(dtype),
+        tokens=encode_strings(tokens),
+        iterations=lda_model.iterations,
+        gamma_threshold=lda_model.gamma_threshold,
+        minimum_probability=lda_model.minimum_probability,
+        # Export settings, reused when a stale export is rewritten
+        dtype=dtype,
+        filter_extremes=np.array([-1 if value is None else value for value in (no_below, no_above, keep_n)],
+                                 dtype=np.float64),
+    )
+    return path
+
+
+def export_settings(path):
+    # dtype and filter_extremes thresholds an existing export was written with
+    with np.load(path, allow_pickle=False) as data:
+        if 'dtype' not in data.files:
+            return {}
+        no_below, no_above, keep_n = (None if value < 0 else value for value in data['filter_extremes'].tolist())
+        return {'dtype': str(data['dtype']), 'no_below': None if no_below is None else int(no_below),
+                'no_above': no_above, 'keep_n': None if keep_n is None else int(keep_n)}
+
+
+def is_stale(name, model_dir=MODEL_DIR, path=None):
+    path = path or engine_path(name, model_dir)
+    return not is_current(path, 'engine_version', ENGINE_VERSION, ModelRegistry(model_dir).version(name))
+
+
+def load_engine(name, model_dir=MODEL_DIR):
+    # Re-export from the gensim files if the .npz is missing, older than the model, an old
+    # layout or not written with the default settings (a compact export is never served)
+    path = engine_path(name, model_dir)
+    if is_stale(name, model_dir, path) or export_settings(path) != DEFAULT_SETTINGS:
+        print(f"Inference engine {path} is missing or stale; exporting from the {name} model")
+        export_engine(name, model_dir, path)
+    return NumpyLda.load(path)
+
+
+def check_parity(name, texts, model_dir=MODEL_DIR, engine=None):
+    """
+    Compare get_document_topics from gensim and the NumPy engine.
+
+    gensim starts each document from a random gamma, so probabilities agree up
+    to the convergence tolerance rather than exactly. A float16 or pruned
+    export adds its own drift on top.
+
+    Returns:
+        dict: documents compared, max absolute probability difference and the
+        number of documents whose dominant topic differs.
+    """
+    registry = ModelRegistry(model_dir)
+    lda_model, dictionary = registry.lda_model(name), registry.dictionary(name)
+    engine = engine or load_engine(name, model_dir)
+
+    # Each side maps tokens with its own vocabulary; they only differ for pruned exports
+    token_lists = [text.split() for text in texts]
+    reference = np.array([[prob for _, prob in lda_model.get_document_topics(dictionary.doc2bow(tokens),
+                                                                             minimum_probability=0.0)]
+                          for tokens in token_lists]).reshape(-1, engine.num_topics)
+    probabilities = engine.topic_probabilities([engine.doc2bow(tokens) for tokens in token_lists])
+    return {
+        'documents': len(token_lists),
+        'max_difference': float(np.abs(reference - probabilities).max()) if len(token_lists) else 0.0,
+        'dominant_mismatches': int((reference.argmax(axis=1) != probabilities.argmax(axis=1)).sum()),
+    }
+
+
+def artifact_sizes(name, model_dir=MODEL_DIR, engine=None, path=None):
+    """
+    Bytes on disk and in memory for the gensim artifacts and the engine export.
+
+    Returns:
+        dict: 'gensim_disk', 'gensim_memory' (expElogbeta plus the training
+        state's sufficient statistics), 'engine_disk' and 'engine_memory'
+        (the engine's topic-word matrices).
+    """
+    registry = ModelRegistry(model_dir, mmap=None)
+    lda_model = registry.lda_model(name)
+    engine = engine or load_engine(name, model_dir)
+    gensim_files = glob.glob(registry.path(name, 'model') + '*') + [registry.path(name, 'dictionary')]
+    return {
+        'gensim_disk': sum(os.path.getsize(file_path) for file_path in gensim_files),
+        'gensim_memory': lda_model.expElogbeta.nbytes + lda_model.state.sstats.nbytes,
+        'engine_disk': os.path.getsize(path or engine_path(name, model_dir)),
+        'engine_memory': engine.expElogbeta.nbytes + engine.topics.nbytes,
+    }
+
+
+def main():
+    import argparse
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Export NumPy inference engines and check them against gensim.")
+    parser.add_argument('names', nargs='*', default=list(MODEL_NAMES))
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default='float32')
+    parser.add_argument('--no-below', type=int, help="filter_extremes no_below for the exported vocabulary")
+    parser.add_argument('--no-above', type=float, help="filter_extremes no_above for the exported vocabulary")
+    parser.add_argument('--keep-n', type=int, help="filter_extremes keep_n for the exported vocabulary")
+    parser.add_argument('--texts', default=os.path.join(os.path.dirname(MODEL_DIR), '..', 'labeled_documents.csv'),
+                        help="CSV with processed_reviews (and rating) to measure drift on")
+    parser.add_argument('--output-dir', help="folder for non-default exports (default: a new temporary folder); "
+                                             "the live engine is only rewritten with the default settings")
+    args = parser.parse_args()
+
+    settings = {'dtype': args.dtype, 'no_below': args.no_below, 'no_above': args.no_above, 'keep_n': args.keep_n}
+    output_dir = None
+    if settings != DEFAULT_SETTINGS:
+        output_dir = args.output_dir or tempfile.mkdtemp(prefix='lda_engine_')
+        os.makedirs(output_dir, exist_ok=True)
+        if os.path.abspath(output_dir) == os.path.abspath(MODEL_DIR):
+            parser.error("non-default exports cannot be written over the live engines in the model folder")
+
+    df = pd.read_csv(args.texts).dropna(subset=['processed_reviews'])
+    for name in args.names:
+        path = engine_path(name, output_dir) if output_dir else None
+        path = export_engine(name, path=path, **settings)
+        engine = NumpyLda.load(path)
+
+        # Same split as the notebook: ratings 1-3 were modelled by jelek, 4-5 by bagus
+        rows = df
+        if 'rating' in df:
+            rows = df[df['rating'] <= 3] if name == 'jelek' else df[df['rating'] >= 4]
+        result = check_parity(name, rows['processed_reviews'].astype(str).tolist(), engine=engine)
+        sizes = artifact_sizes(name, engine=engine, path=path)
+
+        print(f"Wrote {path} ({args.dtype}, {len(engine.token2id)} words{'' if output_dir else ', live engine'})")
+        print(f"  {result['documents']} documents, max probability difference {result['max_difference']:.2e}, "
+              f"dominant topic mismatches {result['dominant_mismatches']}")
+        print(f"  disk   {sizes['gensim_disk'] / 1024:.1f} KiB gensim -> {sizes['engine_disk'] / 1024:.1f} KiB engine "
+              f"({1 - sizes['engine_disk'] / sizes['gensim_disk']:.0%} saved)")
+        print(f"  memory {sizes['gensim_memory'] / 1024:.1f} KiB gensim -> {sizes['engine_memory'] / 1024:.1f} KiB engine "
+              f"({1 - sizes['engine_memory'] / sizes['gensim_memory']:.0%} saved)")
+
+
+if __name__ == '__main__':
+    main()
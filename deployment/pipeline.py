@@ -0,0 +1,408 @@
+# Stage-based preprocessing pipeline shared by every entry point
+# (prepro_script.py and the async copies under model_dicts/ and Modeling and Inference/).
+import os
+import re
+import threading
+import time
+from lexicon import load_lexicon
+
+# Paths are resolved relative to this file, not the working directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JSON_DIR = os.path.join(BASE_DIR, 'JSONs')
+MODEL_DIR = os.path.join(BASE_DIR, 'model_dicts')
+LEXICON_PATH = os.path.join(MODEL_DIR, 'lexicon.pkl')
+STEM_CACHE_PATH = os.path.join(MODEL_DIR, 'stem_cache.json')
+TRANSLATION_CACHE_PATH = os.path.join(MODEL_DIR, 'translation_cache.sqlite')
+
+# Precompiled cleaning patterns. Mention, hashtag and literal "\\n" removal
+# never overlap, so they share a single pass.
+tag_newline_pattern = re.compile(r"[@#][A-Za-z0-9_]+|\\n")
+http_pattern = re.compile(r"http\S+")
+www_pattern = re.compile(r"www.\S+")
+non_letter_pattern = re.compile(r"[^A-Za-z\s']")
+repeat_pattern = re.compile(r'(.)\1{2,}')
+
+STAGE_NAMES = ('translate', 'contractions', 'clean', 'tokenize', 'lexicon', 'stem')
+COMPONENTS = ('word_tokenize', 'fix_contractions', 'lexicon', 'stem_cache', 'translation_worker')
+
+
+class Stage:
+    """
+    One named step of a Pipeline.
+
+    Args:
+        name (str): Stage name, used for lookups, swapping and timing.
+        func (callable): Maps a text to a text (or to tokens, for the tokenizer).
+            Returning None drops the text, e.g. when translation fails.
+        per_token (bool): func maps a single token to a token, or to None to drop it.
+        batch_func (callable): Optional list-in, list-out version of func.
+        async_func (callable): Optional coroutine version of func.
+    """
+
+    def __init__(self, name, func, per_token=False, batch_func=None, async_func=None):
+        self.name = name
+        self.func = func
+        self.per_token = per_token
+        self.batch_func = batch_func
+        self.async_func = async_func
+
+    def __repr__(self):
+        return f"Stage({self.name!r}{', per_token=True' if self.per_token else ''})"
+
+
+class StageStats:
+    # Timing hook: wall time and number of items passed through each stage
+
+    def __init__(self):
+        self.calls = {}
+        self.seconds = {}
+
+    def __call__(self, name, seconds, calls=1):
+        self.calls[name] = self.calls.get(name, 0) + calls
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def reset(self):
+        self.calls.clear()
+        self.seconds.clear()
+
+    def report(self):
+        total = sum(self.seconds.values())
+        return {
+            name: {
+                'calls': self.calls[name],
+                'seconds': seconds,
+                'share': seconds / total if total else 0.0,
+            }
+            for name, seconds in self.seconds.items()
+        }
+
+
+class Pipeline:
+    """
+    Ordered list of stages. Text stages run first, then the tokenizer, then
+    per-token stages; the surviving tokens are joined with spaces.
+
+    Args:
+        stages (list): Stage objects, in order.
+        hooks (list): Callables hook(stage_name, seconds, calls) invoked after
+            each stage runs. No timing is done when there are no hooks.
+    """
+
+    def __init__(self, stages, hooks=None):
+        self.stages = list(stages)
+        self.hooks = list(hooks or [])
+
+    @property
+    def names(self):
+        return [stage.name for stage in self.stages]
+
+    def get(self, name):
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(f"No stage named {name!r}; stages are {self.names}")
+
+    def replace(self, name, stage):
+        # Returns a new pipeline with one stage swapped out
+        self.get(name)
+        return Pipeline([stage if s.name == name else s for s in self.stages], self.hooks)
+
+    def without(self, *names):
+        # Returns a new pipeline without the given stages, e.g. without('translate')
+        for name in names:
+            self.get(name)
+        return Pipeline([s for s in self.stages if s.name not in names], self.hooks)
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+        return hook
+
+    def instrument(self):
+        # Shortcut for add_hook(StageStats())
+        return self.add_hook(StageStats())
+
+    def _record(self, name, seconds, calls):
+        for hook in self.hooks:
+            hook(name, seconds, calls)
+
+    @staticmethod
+    def _finish(value):
+        return ' '.join(value) if isinstance(value, list) else value
+
+    def _apply(self, stage, value):
+        if stage.per_token:
+            result = []
+            for token in value:
+                token = stage.func(token)
+                if token is not None:
+                    result.append(token)
+            return result
+        return stage.func(value)
+
+    def run(self, text):
+        value = text
+        for stage in self.stages:
+            if self.hooks:
+                calls = len(value) if stage.per_token else 1
+                start = time.perf_counter()
+                value = self._apply(stage, value)
+                self._record(stage.name, time.perf_counter() - start, calls)
+            else:
+                value = self._apply(stage, value)
+            if value is None:
+                return None
+        return self._finish(value)
+
+    async def run_async(self, text):
+        value = text
+        for stage in self.stages:
+            calls = len(value) if stage.per_token else 1
+            start = time.perf_counter()
+            if stage.async_func is not None:
+                value = await stage.async_func(value)
+            else:
+                value = self._apply(stage, value)
+            if self.hooks:
+                self._record(stage.name, time.perf_counter() - start, calls)
+            if value is None:
+                return None
+        return self._finish(value)
+
+    def run_batch(self, texts):
+        """
+        Run every stage over the whole batch. Output is identical to calling
+        run on each text. Consecutive per-token stages run once per distinct
+        token of the batch.
+
+        Returns:
+            list: Processed texts, or None where a stage dropped the text.
+        """
+        values = list(texts)
+        index = 0
+        while index < len(self.stages):
+            stage = self.stages[index]
+            if stage.per_token:
+                group = []
+                while index < len(self.stages) and self.stages[index].per_token:
+                    group.append(self.stages[index])
+                    index += 1
+                values = self._run_token_group(group, values)
+                continue
+
+            live = [value for value in values if value is not None]
+            start = time.perf_counter()
+            if stage.batch_func is not None:
+                results = stage.batch_func(live)
+            else:
+                results = [stage.func(value) for value in live]
+            if self.hooks:
+                self._record(stage.name, time.perf_counter() - start, len(live))
+
+            results = iter(results)
+            values = [None if value is None else next(results) for value in values]
+            index += 1
+
+        return [None if value is None else self._finish(value) for value in values]
+
+    def _run_token_group(self, group, values):
+        # Raw token -> result after the group so far (None once dropped)
+        lookup = {token: token for tokens in values if tokens is not None for token in tokens}
+
+        for stage in group:
+            func = stage.func
+            start = time.perf_counter()
+            calls = 0
+            for raw, token in lookup.items():
+                if token is not None:
+                    lookup[raw] = func(token)
+                    calls += 1
+            if self.hooks:
+                self._record(stage.name, time.perf_counter() - start, calls)
+
+        return [None if tokens is None else [lookup[token] for token in tokens if lookup[token] is not None]
+                for tokens in values]
+
+
+class TextPreprocessor:
+    """
+    Owns the pipeline's heavy components (tokenizer, contractions, lexicon,
+    Sastrawi stemmer, translation client), created on first use, and the
+    default Pipeline built from them. Call warmup() to pay the loading cost
+    up front, e.g. in a worker initializer.
+    """
+
+    def __init__(self, json_dir=JSON_DIR, lexicon_path=LEXICON_PATH,
+                 stem_cache_path=STEM_CACHE_PATH, translation_cache_path=TRANSLATION_CACHE_PATH):
+        self.json_dir = json_dir
+        self.lexicon_path = lexicon_path
+        self.stem_cache_path = stem_cache_path
+        self.translation_cache_path = translation_cache_path
+        self._lock = threading.RLock()
+        self._word_tokenize = None
+        self._fix_contractions = None
+        self._lexicon = None
+        self._stem_cache = None
+        self._translation_worker = None
+        self.pipeline = Pipeline(self.stages())
+
+    @property
+    def word_tokenize(self):
+        # Same tokens as nltk.word_tokenize; NLTK is only imported for text outside the fast path
+        if self._word_tokenize is None:
+            with self._lock:
+                if self._word_tokenize is None:
+                    from tokenizer import fast_word_tokenize
+                    self._word_tokenize = fast_word_tokenize
+        return self._word_tokenize
+
+    @property
+    def fix_contractions(self):
+        if self._fix_contractions is None:
+            with self._lock:
+                if self._fix_contractions is None:
+                    import contractions
+                    self._fix_contractions = contractions.fix
+        return self._fix_contractions
+
+    @property
+    def lexicon(self):
+        # Fused slang/stopword table (token -> replacement or None), compiled from the JSON sources
+        if self._lexicon is None:
+            with self._lock:
+                if self._lexicon is None:
+                    self._lexicon = load_lexicon(self.lexicon_path, self.json_dir)
+        return self._lexicon
+
+    @property
+    def stem_cache(self):
+        # Stems saved by a previous worker skip the cold-start stemming cost
+        if self._stem_cache is None:
+            with self._lock:
+                if self._stem_cache is None:
+                    from stem_cache import StemCache, create_stemmer
+                    stem_cache = StemCache(create_stemmer())
+                    stem_cache.load(self.stem_cache_path)
+                    self._stem_cache = stem_cache
+        return self._stem_cache
+
+    @property
+    def translation_worker(self):
+        # Translations are cached on disk so reruns only pay for new text
+        if self._translation_worker is None:
+            with self._lock:
+                if self._translation_worker is None:
+                    from translation import get_translation_worker
+                    from translation_cache import CachedTranslationWorker, TranslationCache
+                    self._translation_worker = CachedTranslationWorker(
+                        get_translation_worker(), TranslationCache(self.translation_cache_path))
+        return self._translation_worker
+
+    @translation_worker.setter
+    def translation_worker(self, worker):
+        self._translation_worker = worker
+
+    def warmup(self, components=COMPONENTS):
+        """
+        Load components now instead of on the first review.
+
+        Args:
+            components (iterable): Names of the components to load; all by default.
+
+        Returns:
+            dict: Seconds spent loading each component.
+        """
+        timings = {}
+        for name in components:
+            start = time.perf_counter()
+            getattr(self, name)
+            timings[name] = time.perf_counter() - start
+        return timings
+
+    # Stage functions. Components are looked up on each call so they stay lazy
+    # and can be swapped (e.g. a fake translation worker) after construction.
+
+    def translate(self, text):
+        try:
+            return self.translation_worker.translate(text, src='auto', dest='id').text
+        except Exception as e:
+            print(f"Translation failed: {e}")
+            return None  # Drop text if translation fails
+
+    def translate_many(self, texts):
+        # Translate the whole batch through the throttled worker
+        results = []
+        for translated in self.translation_worker.translate_many(texts, src='auto', dest='id'):
+            if isinstance(translated, BaseException):
+                print(f"Translation failed: {translated}")
+                results.append(None)
+            else:
+                results.append(translated.text)
+        return results
+
+    async def translate_async(self, text):
+        try:
+            translated = await self.translation_worker.translate_async(text, src='auto', dest='id')
+            return translated.text
+        except Exception as e:
+            print(f"Translation failed: {e}")
+            return None
+
+    def expand_contractions(self, text):
+        return self.fix_contractions(text)
+
+    def clean(self, text):
+        # Case folding
+        text = text.lower()
+
+        # Mention, hashtag and newline (\n) removal
+        text = tag_newline_pattern.sub(" ", text)
+
+        # Whitespace removal
+        text = text.strip()
+
+        # URL removal
+        text = http_pattern.sub(" ", text)
+        text = www_pattern.sub(" ", text)
+
+        # Non-letter removal (retain apostrophes)
+        text = non_letter_pattern.sub(" ", text)
+
+        # Repeat letter removal
+        return repeat_pattern.sub(r'\1', text)
+
+    def tokenize(self, text):
+        return self.word_tokenize(text)
+
+    def apply_lexicon(self, word):
+        # Slang replacement and stopword removal in one table lookup
+        return self.lexicon.get(word, word)
+
+    def stem(self, word):
+        return self.stem_cache.stem(word)
+
+    def stages(self):
+        return [
+            Stage('translate', self.translate, batch_func=self.translate_many, async_func=self.translate_async),
+            Stage('contractions', self.expand_contractions),
+            Stage('clean', self.clean),
+            Stage('tokenize', self.tokenize),
+            Stage('lexicon', self.apply_lexicon, per_token=True),
+            Stage('stem', self.stem, per_token=True),
+        ]
+
+    def clean_text(self, text):
+        # Same steps as preprocess, up to tokenization
+        return self.clean(self.expand_contractions(text))
+
+    def preprocess(self, text):
+        return self.pipeline.run(text)
+
+    async def preprocess_async(self, text):
+        return await self.pipeline.run_async(text)
+
+    def preprocess_batch(self, texts):
+        return self.pipeline.run_batch(texts)
+
+    def save_stem_cache(self, path=None):
+        # Persist learned stems next to the model artifacts for the next worker
+        self.stem_cache.save(path or self.stem_cache_path)
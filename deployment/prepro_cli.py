@@ -0,0 +1,172 @@
+# Parallel, resumable corpus preprocessing
+# Run from the deployment folder:
+#   python prepro_cli.py --input ../cleaned_reviews.csv --output ../prepro_cleaned_reviews.csv
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import prepro_script
+from pipeline import STAGE_NAMES
+from translation import add_translator_args, make_translator
+
+STAGES = list(STAGE_NAMES)
+
+
+def process_translated(texts):
+    """
+    Run the CPU-bound stages on already translated texts, timing each stage.
+
+    Args:
+        texts (list): Translated texts, or None where translation failed.
+
+    Returns:
+        tuple: (processed texts, {stage: seconds})
+    """
+    pipeline = prepro_script.preprocessor.pipeline.without('translate')
+    stats = pipeline.instrument()
+    return pipeline.run_batch(texts), stats.seconds
+
+
+def init_worker():
+    # Load the tokenizer, lexicon and stemmer once per pool process
+    prepro_script.warmup(['word_tokenize', 'fix_contractions', 'lexicon', 'stem_cache'])
+
+
+def translate_chunk(texts):
+    # Runs in the main process: translation is I/O bound and goes through the cache
+    return prepro_script.preprocessor.translate_many(texts)
+
+
+def checkpoint_path(checkpoint_dir, index):
+    return os.path.join(checkpoint_dir, f"chunk_{index:05d}.csv")
+
+
+def write_checkpoint(chunk, path):
+    tmp_path = f"{path}.tmp"
+    chunk.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def check_manifest(checkpoint_dir, input_path, chunksize):
+    # Checkpoints are only reusable with the same input and chunk boundaries
+    manifest_path = os.path.join(checkpoint_dir, 'manifest.json')
+    manifest = {'input': os.path.abspath(input_path), 'chunksize': chunksize}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            existing = json.load(f)
+        if existing != manifest:
+            raise ValueError(f"Checkpoints in {checkpoint_dir} were made with {existing}; "
+                             f"use another --checkpoint-dir or delete it.")
+    else:
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+
+
+def report(rows, timings, workers):
+    print("Stage throughput (rows/sec; CPU stages summed over workers):")
+    for stage in STAGES:
+        seconds = timings[stage]
+        rate = rows / seconds if seconds > 0 else float('inf')
+        print(f"  {stage:<12} {seconds:8.2f}s  {rate:10.0f} rows/s")
+    cpu_seconds = sum(timings[stage] for stage in STAGES[1:])
+    if cpu_seconds > 0:
+        print(f"  CPU stages with {workers} workers: ~{rows * workers / cpu_seconds:.0f} rows/s")
+
+
+def run(input_path, output_path, checkpoint_dir, chunksize, workers, column='reviews'):
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    check_manifest(checkpoint_dir, input_path, chunksize)
+
+    timings = dict.fromkeys(STAGES, 0.0)
+    rows_done = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        pending = []
+        for index, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+            path = checkpoint_path(checkpoint_dir, index)
+            if os.path.exists(path):
+                print(f"Chunk {index}: checkpoint found, skipping")
+                continue
+
+            # Translate this chunk while workers process earlier ones
+            stage_start = time.perf_counter()
+            translated = translate_chunk(chunk[column].tolist())
+            timings['translate'] += time.perf_counter() - stage_start
+
+            pending.append((index, chunk, path, pool.submit(process_translated, translated)))
+
+            # Bound memory: keep at most two chunks per worker in flight
+            while len(pending) >= workers * 2:
+                rows_done += finish_chunk(pending.pop(0), timings)
+
+        while pending:
+            rows_done += finish_chunk(pending.pop(0), timings)
+
+    elapsed = time.perf_counter() - start
+    print(f"Processed {rows_done} new rows in {elapsed:.1f}s "
+          f"({rows_done / elapsed if elapsed else 0:.0f} rows/s overall)")
+    if rows_done:
+        report(rows_done, timings, workers)
+
+    # An input without rows still produces a file with the output header
+    columns = list(pd.read_csv(input_path, nrows=0).columns) + ['processed_reviews']
+    merge_checkpoints(checkpoint_dir, output_path, columns)
+
+
+def finish_chunk(item, timings):
+    index, chunk, path, future = item
+    processed, chunk_timings = future.result()
+    for stage, seconds in chunk_timings.items():
+        timings[stage] += seconds
+
+    chunk = chunk.copy()
+    chunk['processed_reviews'] = processed
+    write_checkpoint(chunk, path)
+    print(f"Chunk {index}: {len(chunk)} rows checkpointed")
+    return len(chunk)
+
+
+def merge_checkpoints(checkpoint_dir, output_path, columns=None):
+    """
+    Concatenate the chunk checkpoints into the output CSV.
+
+    Args:
+        columns (list): Output columns, written as a header-only CSV when
+            there are no checkpoints (an input without rows).
+    """
+    paths = sorted(glob.glob(os.path.join(checkpoint_dir, 'chunk_*.csv')))
+    if not paths:
+        pd.DataFrame(columns=columns or []).to_csv(output_path, index=False)
+        print(f"Wrote 0 rows to {output_path}")
+        return
+    merged = pd.concat((pd.read_csv(path) for path in paths), ignore_index=True)
+
+    # Extract only the date (remove the time), as in the notebook
+    merged['parsed_date'] = pd.to_datetime(merged['parsed_date']).dt.date
+    merged.to_csv(output_path, index=False)
+    print(f"Wrote {len(merged)} rows to {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocess the review corpus in parallel, resumably.")
+    parser.add_argument('--input', default='../cleaned_reviews.csv')
+    parser.add_argument('--output', default='../prepro_cleaned_reviews.csv')
+    parser.add_argument('--checkpoint-dir', default='../prepro_checkpoints')
+    parser.add_argument('--chunksize', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    add_translator_args(parser)
+    args = parser.parse_args()
+
+    worker = make_translator(args)
+    if worker is not None:
+        prepro_script.preprocessor.translation_worker = worker
+
+    run(args.input, args.output, args.checkpoint_dir, args.chunksize, args.workers)
+
+
+if __name__ == '__main__':
+    main()
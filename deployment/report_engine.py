@@ -0,0 +1,256 @@
+# Analysis report for one dataset (jelek or bagus), company and province.
+# Every metric comes from the structures refreshed with the labeled data: topic
+# counts from the topic cube, word and n-gram tables from the n-gram index and
+# the word cloud from its PNG cache. No DataFrame is filtered or modified per
+# request. build_report returns a plain AnalysisReport; analysis_section only
+# renders it. Benchmark with: python bench_report.py
+import os
+import plotly.express as px
+import pandas as pd
+import streamlit as st
+from labeled_store import load_labeled, load_ngrams, load_topic_cube
+from model_registry import dashboard_label
+from wordcloud_cache import word_cloud_png
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ALL_PROVINCES = "All Provinces"
+
+# Recommendation blocks, as on the original pages; the trailing double spaces
+# are Markdown line breaks and must be kept
+SARAN_DELAY = '''
+Identifikasi Akar Permasalahan pada Keterlambatan Pengiriman :
+- Analisis alur logistik untuk menemukan bottleneck, seperti pengelolaan rute, kapasitas armada, atau penjadwalan.  
+- Terapkan teknologi optimasi rute (misalnya, sistem berbasis GPS) dan tingkatkan transparansi dengan sistem pelacakan real-time.  
+'''
+
+SARAN_GUDANG = '''
+Tingkatkan Kualitas Pelayanan di Gudang :  
+- Lakukan pelatihan intensif untuk staf gudang mengenai standar operasional dan pelayanan pelanggan.  
+- Evaluasi fasilitas gudang untuk memastikan proses penyortiran dan pemrosesan barang berjalan efisien.  
+'''
+
+SARAN_KURIR = '''
+Perbaiki Sistem dan Komunikasi Kurir:  
+- Terapkan sistem penjadwalan komunikasi otomatis, seperti notifikasi melalui aplikasi, SMS, atau email yang memberi tahu status pengiriman.  
+- Adakan pelatihan rutin kepada kurir tentang layanan pelanggan dan penanganan barang yang baik.  
+- Sediakan feedback system khusus untuk kurir, sehingga pelanggan dapat melaporkan masalah dengan lebih mudah.  
+'''
+
+SARAN_MONITORING = '''
+Monitoring dan Evaluasi Secara Berkala:  
+- Lakukan audit performa gudang dan kurir berdasarkan wilayah untuk memastikan konsistensi layanan.  
+- Adakan survei kepuasan pelanggan setelah setiap pengiriman untuk mendapatkan masukan langsung.  
+
+Dengan langkah-langkah tersebut, diharapkan perusahaan dapat meningkatkan efisiensi operasional, memperbaiki pengalaman pelanggan, dan memperkuat reputasi sebagai layanan ekspedisi yang andal dan memuaskan.
+'''
+
+# Pie chart insight sentences for the largest, second and third topic
+INSIGHT_TEMPLATES = [
+    "Dari hasil visualisasi pie chart di atas, ditemukan bahwa distribusi topik didominasi oleh {phrase} ({pct:.1f}%). Hal ini menunjukkan bahwa {insight}",
+    "Kemudian, topik selanjutnya adalah terkait {phrase} ({pct:.1f}%), yang menunjukkan bahwa {insight}",
+    "Terakhir, topik {phrase} ({pct:.1f}%) mengindikasikan bahwa {insight}",
+]
+
+# Page copy per dataset:
+#   topics: (topic label in the CSV, phrase used in the insight text), in share tie-break order
+#   insights: phrase -> pie chart insight
+#   problems: phrase of the largest topic -> (problem, insight) for the word cloud sentence
+#   recommendations: (topic label, markdown) shown when the topic has reviews, in page order
+DATASETS = {
+    'jelek': {
+        'csv': os.path.join(BASE_DIR, 'labeled_documents.csv'),
+        'topics': [
+            (dashboard_label('jelek', 1), 'keterlambatan pengiriman'),
+            (dashboard_label('jelek', 2), 'komunikasi kurir'),
+            (dashboard_label('jelek', 0), 'kualitas pelayanan yang buruk'),
+        ],
+        'insights': {
+            'keterlambatan pengiriman': "sebagian besar pelanggan di wilayah tertentu mengeluhkan waktu pengiriman yang tidak sesuai dengan ekspektasi atau janji yang diberikan.",
+            'komunikasi kurir': "pelanggan merasa tidak puas dengan sikap atau perilaku kurir. Hal ini dapat mencakup keluhan seperti kurir yang melempar barang, salah lokasi pengiriman, atau kurir yang sulit dihubungi.",
+            'kualitas pelayanan yang buruk': "pelayanan di gudang pada wilayah tertentu tidak memuaskan atau bahkan mengecewakan pelanggan.",
+        },
+        'word_insight': "Berdasarkan Word Cloud diatas, dapat dilihat bahwa masalah utama yang terjadi adalah {problem}. Hal ini terlihat dari kata-kata yang sering muncul, seperti {words}. {insight}",
+        'problems': {
+            'keterlambatan pengiriman': ("keterlambatan pengiriman", "Masalah ini menunjukkan adanya kendala dalam manajemen waktu pengiriman, yang dapat disebabkan karena rute yang kurang optimal, kurangnya armada, atau kesalahan operasional."),
+            'komunikasi kurir': ("buruknya komunikasi antara kurir dan pelanggan", "Masalah ini menunjukkan adanya kebutuhan untuk meningkatkan keterampilan komunikasi kurir dan sistem pelacakan pengiriman."),
+            'kualitas pelayanan yang buruk': ("buruknya kualitas pelayanan", "Masalah ini mencerminkan ketidakpuasan pelanggan terhadap layanan di Gudang terkait."),
+        },
+        'recommendations': [
+            (dashboard_label('jelek', 1), SARAN_DELAY),
+            (dashboard_label('jelek', 0), SARAN_GUDANG),
+            (dashboard_label('jelek', 2), SARAN_KURIR),
+        ],
+    },
+    'bagus': {
+        'csv': os.path.join(BASE_DIR, 'bagus_labeled_documents.csv'),
+        'topics': [
+            (dashboard_label('bagus', 0), 'pelayanan yang bagus'),
+            (dashboard_label('bagus', 1), 'faktor kantor cabang'),
+            (dashboard_label('bagus', 2), 'faktor respon staf'),
+        ],
+        'insights': {
+            'pelayanan yang bagus': "pelayanan di gudang pada wilayah tertentu tidak memuaskan atau bahkan mengecewakan pelanggan.",
+            'faktor kantor cabang': "sebagian besar pelanggan di wilayah tertentu mengeluhkan waktu pengiriman yang tidak sesuai dengan ekspektasi atau janji yang diberikan.",
+            'faktor respon staf': "pelanggan merasa tidak puas dengan sikap atau perilaku kurir. Hal ini dapat mencakup keluhan seperti kurir yang melempar barang, salah lokasi pengiriman, atau kurir yang sulit dihubungi.",
+        },
+        'word_insight': "Berdasarkan Word Cloud diatas, dapat dilihat bahwa hal yang membuat gudang ini dinilai bagus oleh reviewer adalah {problem}. Hal ini terlihat dari kata-kata yang sering muncul, seperti {words}. {insight}",
+        'problems': {
+            'pelayanan yang bagus': ("buruknya kualitas pelayanan", "Masalah ini mencerminkan ketidakpuasan pelanggan terhadap layanan di Gudang terkait."),
+            'faktor kantor cabang': ("kantor cabang yang dinilai strategis", "Masalah ini menunjukkan adanya kendala dalam manajemen waktu pengiriman, yang dapat disebabkan karena rute yang kurang optimal, kurangnya armada, atau kesalahan operasional."),
+            'faktor respon staf': ("faktor respon staf yang memuaskan pelanggan", "Masalah ini menunjukkan adanya kebutuhan untuk meningkatkan keterampilan komunikasi kurir dan sistem pelacakan pengiriman."),
+        },
+        'recommendations': [
+            (dashboard_label('bagus', 2), SARAN_DELAY),
+            (dashboard_label('bagus', 1), SARAN_GUDANG),
+            (dashboard_label('bagus', 0), SARAN_KURIR),
+        ],
+    },
+}
+
+
+class AnalysisReport:
+    """
+    Everything the Analysis page shows for one selection, ready to render.
+
+    Args:
+        dataset (str): 'jelek' or 'bagus'.
+        company (str): Company name.
+        province (str): Province name, or None for all provinces.
+        review_count (int): Reviews in the selection.
+        topic_counts (pandas.Series): Reviews per topic present, largest first.
+        insights (list): Pie chart insight sentences, largest topic first.
+        wordcloud_png (bytes): Word cloud image, or None without words.
+        top_words (list): (word, count) of the five most common words.
+        wordcloud_insight (str): Sentence under the word cloud, or None without reviews.
+        bigrams (list): (bigram tuple, count) of the ten most common bigrams.
+        trigrams (list): (trigram tuple, count) of the ten most common trigrams.
+        recommendations (list): Markdown blocks for the topics present, then the closing advice.
+    """
+
+    def __init__(self, dataset, company, province, review_count, topic_counts, insights, wordcloud_png,
+                 top_words, wordcloud_insight, bigrams, trigrams, recommendations):
+        self.dataset = dataset
+        self.company = company
+        self.province = province
+        self.review_count = review_count
+        self.topic_counts = topic_counts
+        self.insights = insights
+        self.wordcloud_png = wordcloud_png
+        self.top_words = top_words
+        self.wordcloud_insight = wordcloud_insight
+        self.bigrams = bigrams
+        self.trigrams = trigrams
+        self.recommendations = recommendations
+
+
+def province_options(dataset):
+    # Provinces in order of first appearance, as the selectbox has always listed them
+    return [ALL_PROVINCES] + list(load_labeled(DATASETS[dataset]['csv'])['province'].unique())
+
+
+def topic_shares(config, topic_counts):
+    # (phrase, share of the dataset's topics) for topics with reviews, largest first, at most three
+    total = sum(int(topic_counts.get(label, 0)) for label, _ in config['topics'])
+    shares = [(phrase, int(topic_counts.get(label, 0)) / total if total > 0 else 0)
+              for label, phrase in config['topics']]
+    return sorted([item for item in shares if item[1] > 0], key=lambda item: item[1], reverse=True)[:3]
+
+
+def build_report(dataset, company, province=None):
+    """
+    Compute the Analysis page for one dataset, company and province.
+
+    Args:
+        dataset (str): 'jelek' or 'bagus'.
+        company (str): Company name.
+        province (str): Province name; None or "All Provinces" for all provinces.
+
+    Returns:
+        AnalysisReport: Plain values, rendered by analysis_section.
+    """
+    config = DATASETS[dataset]
+    province = None if province == ALL_PROVINCES else province
+    ngram_index = load_ngrams(config['csv'])
+
+    cube = load_topic_cube(config['csv'])
+    topic_counts = cube.distribution(company, province)
+    top_three = topic_shares(config, topic_counts)
+    insights = [template.format(phrase=phrase, pct=share * 100, insight=config['insights'][phrase])
+                for template, (phrase, share) in zip(INSIGHT_TEMPLATES, top_three)]
+
+    top_words = ngram_index.top(company, province, 1, 5)
+    wordcloud_insight = None
+    if top_three and top_words:
+        words = [word for word, _ in top_words]
+        problem, insight = config['problems'][top_three[0][0]]
+        wordcloud_insight = config['word_insight'].format(
+            problem=problem, words=', '.join(words[:-1]) + ' dan ' + words[-1], insight=insight)
+
+    recommendations = [text for label, text in config['recommendations'] if label in topic_counts.index]
+    return AnalysisReport(
+        dataset=dataset,
+        company=company,
+        province=province,
+        review_count=cube.review_count(company, province),
+        topic_counts=topic_counts,
+        insights=insights,
+        wordcloud_png=word_cloud_png(config['csv'], dataset, company, province),
+        top_words=top_words,
+        wordcloud_insight=wordcloud_insight,
+        bigrams=ngram_index.top(company, province, 2, 10),
+        trigrams=ngram_index.top(company, province, 3, 10),
+        recommendations=recommendations + [SARAN_MONITORING],
+    )
+
+
+def render_report(report):
+    st.write(f"Filtered Data: {report.review_count} reviews")
+
+    # Visualization 1: Topic Distribution (Pie Chart)
+    st.subheader("a) Distribution of Topics")
+    fig = px.pie(
+        report.topic_counts,
+        values=report.topic_counts.values,
+        names=report.topic_counts.index,
+        title="Topic Distribution",
+        color_discrete_sequence=px.colors.qualitative.Pastel
+    )
+    st.plotly_chart(fig)
+    for insight in report.insights:
+        st.write(insight)
+
+    # Visualization 2: Word Cloud
+    st.subheader("b) Word Cloud for Processed Reviews")
+    if report.wordcloud_png is not None:
+        st.image(report.wordcloud_png)
+    if report.wordcloud_insight:
+        st.write(report.wordcloud_insight)
+
+    # Visualization 3: N-Grams Analysis
+    st.subheader("c) N-Grams Analysis from Processed Reviews")
+    st.write("Top Bigrams and Trigrams:")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Top Bigrams")
+        st.table(pd.DataFrame(report.bigrams, columns=["Bigram", "Count"]))
+    with col2:
+        st.subheader("Top Trigrams")
+        st.table(pd.DataFrame(report.trigrams, columns=["Trigram", "Count"]))
+    st.write("Hasil di atas merupakan hasil kombinasi dua dan tiga kata yang paling sering digunakan dalam review pengguna.")
+
+    st.subheader("d. Masukan")
+    st.write("Berikut adalah masukan yang bisa kami berikan :")
+    for text in report.recommendations:
+        st.markdown(text)
+
+
+def analysis_section(dataset, company):
+    # Province form and report for one dataset; used by both Analysis pages
+    with st.form(key=f'form_{dataset}'):
+        # User selects province or all provinces
+        option = st.selectbox('Provinsi', province_options(dataset))
+        submitted = st.form_submit_button('Show')
+
+    if submitted:
+        render_report(build_report(dataset, company, option))
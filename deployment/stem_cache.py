@@ -0,0 +1,48 @@
+import json
+import os
+from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+from Sastrawi.Stemmer.Stemmer import Stemmer
+from Sastrawi.Dictionary.ArrayDictionary import ArrayDictionary
+from lru_cache import LruCache
+
+
+def create_stemmer():
+    # Sastrawi keeps its root words in a list and scans it on every lookup;
+    # swapping in a set keeps results identical but makes lookups O(1)
+    dictionary = ArrayDictionary()
+    dictionary.words = frozenset(word for word in StemmerFactory().get_words() if word.strip())
+    return Stemmer(dictionary)
+
+
+class StemCache(LruCache):
+    """
+    Bounded LRU cache in front of a Sastrawi stemmer.
+
+    Args:
+        stemmer: Object with a stem(text) method, uncached (see create_stemmer).
+        maxsize (int): Maximum number of cached words; least recently used are evicted.
+    """
+
+    def __init__(self, stemmer, maxsize=50000):
+        super().__init__(maxsize)
+        self.stemmer = stemmer
+
+    def stem(self, word):
+        return self.get(word, lambda: self.stemmer.stem(word))
+
+    def save(self, path):
+        # Entries are written least to most recently used so load() keeps the order
+        items = self.items()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(items, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        # Returns the number of entries loaded; a missing file is a cold start
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'r') as f:
+            items = json.load(f)[-self.maxsize:]
+        self.put_many(items)
+        return len(items)
@@ -0,0 +1,262 @@
+# Streaming review pipeline: rows flow as generators from the compiled dump
+# through cleaning, date parsing, preprocessing, bag-of-words and topic
+# labelling. Only one batch of rows is held in memory at a time.
+# Run from the deployment folder:
+#   python stream_pipeline.py --input ../compiled_reviews.csv
+#   python stream_pipeline.py --input ../prepro_cleaned_reviews.csv --start prepro
+import argparse
+import csv
+import re
+import resource
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import islice
+import prepro_script
+from model_registry import TOPIC_LABELS, dashboard_label, get_engine
+from tokenizer import fast_word_tokenize
+
+CLEANED_COLUMNS = ['rating', 'reviews', 'company', 'province', 'parsed_date']
+PREPRO_COLUMNS = CLEANED_COLUMNS + ['processed_reviews']
+LABELED_COLUMNS = PREPRO_COLUMNS + ['tokenized_reviews', 'topic']
+
+# Review bodies can be longer than the csv module's default field limit
+csv.field_size_limit(sys.maxsize)
+
+
+def read_rows(path):
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+
+def write_rows(rows, path, columns):
+    # Terminal sink; returns the number of rows written
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def tee_rows(rows, path, columns):
+    # Write an intermediate file while passing rows on to the next stage
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            yield row
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def date_mode(path):
+    # Pre-pass for the notebook's mode fill; only distinct date strings are kept
+    counts = Counter(row['Date'] for row in read_rows(path)
+                     if row['Reviews'] != 'No review found' and row['Date'])
+    return counts.most_common(1)[0][0] if counts else ''
+
+
+def parse_time_ago(time_ago, now=None):
+    """
+    Convert a relative Indonesian duration ('5 menit', '2 tahun lalu', 'sehari')
+    into the datetime it refers to, as in the notebook.
+
+    Returns:
+        datetime.datetime or None: None if the format is not recognised.
+    """
+    current_time = now or datetime.now()
+
+    # Match cases with explicit numbers
+    match = re.match(r"(\d+)\s+(\w+)", time_ago)
+    if match:
+        value, unit = int(match.group(1)), match.group(2)
+    else:
+        # Handle "sehari", "seminggu", "sebulan", "setahun" cases
+        if time_ago.startswith('se'):
+            value, unit = 1, time_ago.split()[0][2:]
+        else:
+            return None
+
+    if unit.startswith('menit'):
+        return current_time - timedelta(minutes=value)
+    elif unit.startswith('jam'):
+        return current_time - timedelta(hours=value)
+    elif unit.startswith('hari'):
+        return current_time - timedelta(days=value)
+    elif unit.startswith('minggu'):
+        return current_time - timedelta(weeks=value)
+    elif unit.startswith('bulan'):
+        # Approximate 1 month = 30 days
+        return current_time - timedelta(days=value * 30)
+    elif unit.startswith('tahun'):
+        # Approximate 1 year = 365 days
+        return current_time - timedelta(days=value * 365)
+    return None
+
+
+def clean_rows(rows, fill_date):
+    # Drop placeholder reviews, fill missing dates and standardise column names
+    for row in rows:
+        if row['Reviews'] == 'No review found':
+            continue
+        yield {
+            'rating': row['Rating'],
+            'reviews': row['Reviews'],
+            'company': row['Company'],
+            'province': row['Province'],
+            'date': row['Date'] or fill_date,
+        }
+
+
+def parse_dates(rows, now=None):
+    # There are only a few dozen distinct date strings, so each is translated once
+    now = now or datetime.now()
+    worker = prepro_script.preprocessor.translation_worker
+    parsed = {}
+    for row in rows:
+        date = row.pop('date')
+        if date not in parsed:
+            try:
+                translated = worker.translate(date, src='auto', dest='id').text
+            except Exception as e:
+                print(f"Translation error: {e}")
+                translated = date
+            parsed[date] = parse_time_ago(translated, now)
+        row['parsed_date'] = parsed[date] or ''
+        yield row
+
+
+def preprocess_rows(rows, batch_size):
+    # Reviews are translated and preprocessed a batch at a time
+    for batch in batched(rows, batch_size):
+        processed = prepro_script.text_preprocessing_batch([row['reviews'] for row in batch])
+        for row, text in zip(batch, processed):
+            # Keep only the date, as the notebook does before saving; rows read
+            # back from cleaned_reviews.csv carry it as a 'YYYY-MM-DD HH:MM:SS' string
+            if isinstance(row['parsed_date'], datetime):
+                row['parsed_date'] = row['parsed_date'].date()
+            elif row['parsed_date']:
+                row['parsed_date'] = row['parsed_date'].split(' ')[0]
+            row['processed_reviews'] = '' if text is None else text
+            yield row
+
+
+def load_models():
+    # NumPy inference engines; labelling does not need gensim
+    return {name: get_engine(name) for name in TOPIC_LABELS}
+
+
+def parse_rating(value):
+    # Star rating as an int, or None for an empty or non-numeric value
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def label_rows(rows, models=None):
+    # Bad reviews (rating <= 3) go to the jelek model, good ones to the bagus model;
+    # rows without a usable rating fit neither and are skipped
+    models = models or load_models()
+    for row in rows:
+        rating = parse_rating(row['rating'])
+        if rating is None:
+            print(f"Skipping review with invalid rating {row['rating']!r}: {str(row['reviews'])[:50]!r}")
+            continue
+        name = 'jelek' if rating <= 3 else 'bagus'
+        engine = models[name]
+
+        tokens = fast_word_tokenize(str(row['processed_reviews']))
+        topics = engine.get_document_topics(engine.doc2bow(tokens))
+        best = max(topics, key=lambda x: x[1], default=None)
+
+        row['model'] = name
+        row['tokenized_reviews'] = tokens
+        # Same labels as the notebook, which the dashboard filters on
+        row['topic'] = dashboard_label(name, best[0]) if best else ''
+        yield row
+
+
+def write_labeled(rows, jelek_path, bagus_path):
+    # Route rows into the two files the dashboard reads
+    counts = {'jelek': 0, 'bagus': 0}
+    with open(jelek_path, 'w', newline='', encoding='utf-8') as jelek_file, \
+            open(bagus_path, 'w', newline='', encoding='utf-8') as bagus_file:
+        writers = {}
+        for name, f in (('jelek', jelek_file), ('bagus', bagus_file)):
+            writers[name] = csv.DictWriter(f, fieldnames=LABELED_COLUMNS, extrasaction='ignore')
+            writers[name].writeheader()
+        for row in rows:
+            writers[row['model']].writerow(row)
+            counts[row['model']] += 1
+    return counts
+
+
+def build_stream(input_path, start='compiled', batch_size=256, cleaned_output=None, prepro_output=None):
+    """
+    Chain the pipeline generators from the given starting file.
+
+    Args:
+        input_path (str): compiled_reviews.csv, cleaned_reviews.csv or prepro_cleaned_reviews.csv.
+        start (str): Which of those files input_path is: 'compiled', 'cleaned' or 'prepro'.
+        batch_size (int): Rows per translation/preprocessing batch.
+        cleaned_output, prepro_output (str): Optional paths for intermediate files.
+
+    Returns:
+        generator: Labelled rows.
+    """
+    rows = read_rows(input_path)
+    if start == 'compiled':
+        rows = parse_dates(clean_rows(rows, date_mode(input_path)))
+        if cleaned_output:
+            rows = tee_rows(rows, cleaned_output, CLEANED_COLUMNS)
+    if start in ('compiled', 'cleaned'):
+        rows = preprocess_rows(rows, batch_size)
+        if prepro_output:
+            rows = tee_rows(rows, prepro_output, PREPRO_COLUMNS)
+    return label_rows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream reviews through the full pipeline with bounded memory.")
+    parser.add_argument('--input', default='../compiled_reviews.csv')
+    parser.add_argument('--start', choices=['compiled', 'cleaned', 'prepro'], default='compiled')
+    parser.add_argument('--jelek-output', default='labeled_documents.csv')
+    parser.add_argument('--bagus-output', default='bagus_labeled_documents.csv')
+    parser.add_argument('--cleaned-output', help="also write the cleaned_reviews.csv stage")
+    parser.add_argument('--prepro-output', help="also write the prepro_cleaned_reviews.csv stage")
+    parser.add_argument('--batch-size', type=int, default=256)
+    from translation import add_translator_args, make_translator
+    add_translator_args(parser)
+    args = parser.parse_args()
+
+    worker = make_translator(args)
+    if worker is not None:
+        prepro_script.preprocessor.translation_worker = worker
+
+    start = time.perf_counter()
+    rows = build_stream(args.input, args.start, args.batch_size, args.cleaned_output, args.prepro_output)
+    counts = write_labeled(rows, args.jelek_output, args.bagus_output)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    total = sum(counts.values())
+    print(f"Labelled {total} rows ({counts['jelek']} jelek, {counts['bagus']} bagus) in {elapsed:.1f}s "
+          f"({total / elapsed if elapsed else 0:.0f} rows/s), peak memory {peak_mb:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
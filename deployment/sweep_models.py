@@ -0,0 +1,150 @@
+# Hyperparameter sweep for the LDA models: trains candidates in a process pool,
+# scores each with c_v coherence in the same worker, and keeps the best one.
+# Coherence comes from the saved co-occurrence index (coherence_index.py).
+# Run from the deployment folder:
+#   python sweep_models.py jelek --num-topics 2 3 4 5 --no-below 5 10 --keep-n 1250 5000
+# The results table goes to model_dicts/sweep_<name>_results.csv and the best
+# candidate is saved as a new version (see update_model.py); --promote makes it live.
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import pandas as pd
+from coherence_index import load_index, load_token_lists, topics_from_model
+from model_registry import MODEL_DIR, TOPIC_LABELS
+from update_model import promote, save_version, snapshot_base
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Training settings used in the notebook for each model
+TRAINING = {
+    'jelek': {'iterations': 200, 'passes': 100, 'chunksize': 500},
+    'bagus': {'iterations': 100, 'passes': 80, 'chunksize': 500},
+}
+
+# Set once per pool process by init_worker, so the texts and index are not pickled per candidate
+_token_lists = None
+_index = None
+
+
+def candidate_grid(num_topics, no_below, no_above, keep_n):
+    keys = ('num_topics', 'no_below', 'no_above', 'keep_n')
+    return [dict(zip(keys, values)) for values in itertools.product(num_topics, no_below, no_above, keep_n)]
+
+
+def init_worker(token_lists, index):
+    global _token_lists, _index
+    _token_lists = token_lists
+    _index = index
+
+
+def train_candidate(params, training, random_state=37):
+    """
+    Build the dictionary and corpus for one candidate, train it and score its coherence.
+
+    Returns:
+        tuple: (result row dict, lda_model, dictionary, corpus)
+    """
+    from gensim.corpora import Dictionary
+    from gensim.models import LdaModel
+
+    start = time.perf_counter()
+    dictionary = Dictionary(_token_lists)
+    dictionary.filter_extremes(no_below=params['no_below'], no_above=params['no_above'], keep_n=params['keep_n'])
+    corpus = [dictionary.doc2bow(tokens) for tokens in _token_lists]
+
+    lda_model = LdaModel(corpus=corpus, id2word=dictionary, alpha='auto', eta='auto',
+                         num_topics=params['num_topics'], random_state=random_state, **training)
+    trained = time.perf_counter()
+
+    # Same score as CoherenceModel(coherence='c_v'), without rescanning the texts
+    coherence, _ = _index.coherence(topics_from_model(lda_model))
+    done = time.perf_counter()
+
+    row = dict(params, dictionary_size=len(dictionary), coherence=coherence,
+               train_seconds=trained - start, coherence_seconds=done - trained, wall_seconds=done - start)
+    return row, lda_model, dictionary, corpus
+
+
+def run_sweep(name, token_lists, index, grid, training, workers=None, progress=print):
+    """
+    Train and score every candidate of the grid in a process pool.
+
+    Returns:
+        tuple: (results DataFrame sorted by coherence, (lda_model, dictionary, corpus) of the best)
+    """
+    rows = []
+    best = None
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(token_lists, index)) as pool:
+        futures = [pool.submit(train_candidate, params, training) for params in grid]
+        for future in as_completed(futures):
+            row, lda_model, dictionary, corpus = future.result()
+            rows.append(row)
+            progress(f"{name}: topics={row['num_topics']} no_below={row['no_below']} no_above={row['no_above']} "
+                     f"keep_n={row['keep_n']} -> c_v {row['coherence']:.4f} ({row['wall_seconds']:.1f}s)")
+            # Only the best model so far is kept in memory
+            if best is None or row['coherence'] > best[0]['coherence']:
+                best = (row, lda_model, dictionary, corpus)
+
+    results = pd.DataFrame(rows).sort_values('coherence', ascending=False).reset_index(drop=True)
+    return results, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep LDA hyperparameters in parallel, scored by c_v coherence.")
+    parser.add_argument('name', choices=list(TRAINING))
+    parser.add_argument('--input', default=os.path.join(BASE_DIR, '..', 'prepro_cleaned_reviews.csv'))
+    parser.add_argument('--num-topics', type=int, nargs='+', default=[2, 3, 4, 5])
+    parser.add_argument('--no-below', type=int, nargs='+', default=[5])
+    parser.add_argument('--no-above', type=float, nargs='+', default=[0.5])
+    parser.add_argument('--keep-n', type=int, nargs='+', default=None,
+                        help="defaults to the notebook's value for the model (5000 jelek, 1250 bagus)")
+    parser.add_argument('--passes', type=int, help="override the notebook's passes")
+    parser.add_argument('--iterations', type=int, help="override the notebook's iterations")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--promote', action='store_true', help="make the best candidate the live model")
+    args = parser.parse_args()
+
+    training = dict(TRAINING[args.name])
+    if args.passes:
+        training['passes'] = args.passes
+    if args.iterations:
+        training['iterations'] = args.iterations
+    keep_n = args.keep_n or [5000 if args.name == 'jelek' else 1250]
+    grid = candidate_grid(args.num_topics, args.no_below, args.no_above, keep_n)
+
+    token_lists = load_token_lists(args.input, args.name)
+    index = load_index(args.name, args.input, args.model_dir)
+    print(f"{args.name}: {len(grid)} candidates on {len(token_lists)} reviews, {args.workers} workers")
+    start = time.perf_counter()
+    results, (row, lda_model, dictionary, corpus) = run_sweep(args.name, token_lists, index, grid, training, args.workers)
+    elapsed = time.perf_counter() - start
+
+    results_path = os.path.join(args.model_dir, f'sweep_{args.name}_results.csv')
+    results.to_csv(results_path, index=False)
+    print(results.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+    print(f"Sweep took {elapsed:.1f}s wall clock for {results['wall_seconds'].sum():.1f}s of candidate time")
+    print(f"Wrote {results_path}")
+
+    report = dict(row, model=args.name, documents=len(corpus), new_terms=[],
+                  seconds=row['wall_seconds'], training=training)
+    version = save_version(args.name, lda_model, dictionary, corpus, report, args.model_dir,
+                           version=datetime.now().strftime('%Y%m%d-%H%M%S') + '-sweep')
+    print(f"Best candidate saved as {args.name} version {version}")
+    if args.promote:
+        # The app labels topics by id, so a different topic count needs new labels first
+        if row['num_topics'] != len(TOPIC_LABELS[args.name]):
+            print(f"Not promoted: it has {row['num_topics']} topics but TOPIC_LABELS['{args.name}'] has "
+                  f"{len(TOPIC_LABELS[args.name])}; label the topics, then run "
+                  f"python update_model.py --promote {args.name} {version}")
+            return
+        snapshot_base(args.name, args.model_dir)
+        promote(args.name, version, args.model_dir)
+        print("Promoted to the live model")
+
+
+if __name__ == '__main__':
+    main()
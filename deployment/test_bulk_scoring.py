@@ -0,0 +1,66 @@
+# Bulk scoring gives the same table through the inference service as in this
+# process, including for empty CSV cells. Translation uses FakeTranslator.
+import asyncio
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import prepro_script
+from bulk_scoring import score_texts
+from inference_service import InferenceService, score_batch
+from model_registry import TOPIC_LABELS, ModelRegistry
+from translation import FakeTranslator, TranslationWorker
+
+if not os.path.exists(ModelRegistry().path('jelek', 'model')):
+    pytest.skip("jelek model files are not available", allow_module_level=True)
+
+TEXTS = ['kurir lambat', float('nan'), 'paket rusak', None, '', 'pengiriman sangat lambat dan kurir tidak ramah']
+
+
+class DirectBatcher:
+    # Scores each submitted item right away instead of micro-batching
+    async def submit(self, item):
+        return score_batch([item])[0]
+
+
+class ServiceClient:
+    # InferenceClient.score_many against an in-process InferenceService, errors included
+    def __init__(self):
+        self.service = InferenceService(DirectBatcher())
+
+    def score_many(self, texts, model='jelek'):
+        status, payload = asyncio.run(self.service.handle_score({'texts': list(texts), 'model': model}))
+        if status != 200:
+            raise RuntimeError(payload['error'])
+        return payload['results']
+
+
+@pytest.fixture(autouse=True)
+def fake_translation():
+    # Echo translations and keep them out of the on-disk translation cache
+    preprocessor = prepro_script.preprocessor
+    saved = preprocessor._translation_worker
+    worker = TranslationWorker(FakeTranslator).start()
+    preprocessor.translation_worker = worker
+    yield
+    preprocessor.translation_worker = saved
+    worker.close()
+
+
+def test_service_rejects_non_string_texts():
+    with pytest.raises(RuntimeError, match="'texts' a list of strings"):
+        ServiceClient().score_many(TEXTS)
+
+
+def test_service_and_local_scores_match():
+    local = score_texts(TEXTS, TOPIC_LABELS['jelek'], 'jelek', chunksize=4)
+    remote = score_texts(TEXTS, TOPIC_LABELS['jelek'], 'jelek', chunksize=4, client=ServiceClient())
+
+    assert local['processed_reviews'].tolist() == remote['processed_reviews'].tolist()
+    assert local['topic'].tolist() == remote['topic'].tolist()
+    labels = list(TOPIC_LABELS['jelek'].values())
+    np.testing.assert_allclose(local[labels].to_numpy(), remote[labels].to_numpy(), atol=1e-6)
+    # Missing cells are unscored rows, not errors
+    for i in (1, 3):
+        assert pd.isna(local.loc[i, 'topic']) and local.loc[i, labels].isna().all()
+    assert local['topic'].notna().sum() >= 3
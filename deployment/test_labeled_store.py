@@ -0,0 +1,35 @@
+# Typed snapshots of the labeled CSVs: bad ratings are read as missing instead
+# of failing the whole load, and the Parquet snapshot keeps the same types.
+import pandas as pd
+import pytest
+from labeled_store import build_snapshot, read_typed_csv
+
+
+@pytest.fixture
+def labeled_csv(tmp_path):
+    path = tmp_path / 'labeled_documents.csv'
+    pd.DataFrame({
+        'company': ['JNE', 'JNE', 'J&T', 'J&T'],
+        'province': ['Bali', 'Bali', None, 'Bali'],
+        'topic': ['Delay', None, 'Kurir', 'Delay'],
+        'rating': ['1', '', 'lima', '5'],
+        'parsed_date': ['2024-01-05', 'kemarin', '2024-03-01', None],
+        'processed_reviews': ['paket lambat', 'kurir ramah', 'paket hilang', 'cepat'],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def test_bad_ratings_are_read_as_missing(labeled_csv, capsys):
+    df = read_typed_csv(labeled_csv)
+    assert str(df['rating'].dtype) == 'Int8'
+    assert df['rating'].tolist()[0] == 1 and df['rating'].tolist()[3] == 5
+    assert df['rating'].isna().tolist() == [False, True, True, False]
+    assert "1 non-numeric ratings" in capsys.readouterr().out
+    assert len(df) == 4
+
+
+def test_snapshot_keeps_the_types(labeled_csv, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'labeled_documents.parquet')
+    expected = build_snapshot(labeled_csv, path)
+    pd.testing.assert_frame_equal(pd.read_parquet(path), expected)
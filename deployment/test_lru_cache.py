@@ -0,0 +1,49 @@
+# The shared LRU behind the stem, topic distribution and word cloud caches
+import json
+from lru_cache import LruCache
+from stem_cache import StemCache
+
+
+class UpperStemmer:
+    def __init__(self):
+        self.calls = 0
+
+    def stem(self, word):
+        self.calls += 1
+        return word.upper()
+
+
+def test_evicts_least_recently_used():
+    cache = LruCache(maxsize=2)
+    cache.get('a', lambda: 1)
+    cache.get('b', lambda: 2)
+    assert cache.get('a', lambda: None) == 1
+    cache.get('c', lambda: 3)
+    assert [key for key, _ in cache.items()] == ['a', 'c']
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 3, 'hit_rate': 0.25}
+
+
+def test_get_many_counts_every_key():
+    cache = LruCache(maxsize=10)
+    cache.put_many([('a', 1), ('b', 2)])
+    assert cache.get_many(['a', 'x', 'a', 'b']) == {'a': 1, 'b': 2}
+    assert (cache.hits, cache.misses) == (3, 1)
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()['hit_rate'] == 0.0
+
+
+def test_stem_cache_saves_and_loads_in_lru_order(tmp_path):
+    stemmer = UpperStemmer()
+    cache = StemCache(stemmer, maxsize=2)
+    assert [cache.stem(word) for word in ['kirim', 'paket', 'kirim']] == ['KIRIM', 'PAKET', 'KIRIM']
+    assert stemmer.calls == 2
+
+    path = str(tmp_path / 'stems.json')
+    cache.save(path)
+    with open(path) as f:
+        assert json.load(f) == [['paket', 'PAKET'], ['kirim', 'KIRIM']]
+
+    loaded = StemCache(UpperStemmer(), maxsize=1)
+    assert loaded.load(path) == 1
+    assert loaded.items() == [('kirim', 'KIRIM')]
+    assert loaded.load(str(tmp_path / 'missing.json')) == 0
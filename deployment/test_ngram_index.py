@@ -0,0 +1,41 @@
+# NgramIndex must cover the same reviews as TopicCube: company and province
+# selections include reviews without a topic, topic selections never do, and
+# the top tables match the Analysis page's Counter scans.
+import numpy as np
+import pandas as pd
+from ngram_index import ORDERS, NgramIndex, scan_top
+from topic_cube import TopicCube
+
+REVIEWS = pd.DataFrame({
+    'company': ['JNE', 'JNE', 'JNE', 'JNE', 'J&T'],
+    'province': ['Jawa Barat', 'Jawa Barat', None, 'Bali', 'Bali'],
+    'topic': ['Delay', 'Kurir', None, None, 'Delay'],
+    'parsed_date': ['2024-01-05', '2024-02-10', '2024-02-11', None, '2024-03-01'],
+    'processed_reviews': ['paket lambat sekali', 'kurir ramah sekali', 'paket hilang', 'kurir lambat', np.nan],
+})
+
+
+def test_reviews_without_a_topic_are_indexed():
+    index, cube = NgramIndex.build(REVIEWS), TopicCube(REVIEWS)
+    assert index.frequencies('JNE') == {'paket': 2, 'lambat': 2, 'sekali': 2, 'kurir': 2, 'ramah': 1, 'hilang': 1}
+    assert index.frequencies('JNE', 'Bali') == {'kurir': 1, 'lambat': 1}
+    assert index.frequencies('JNE', topics=['Delay', 'Kurir']) == {
+        'paket': 1, 'lambat': 1, 'sekali': 2, 'kurir': 1, 'ramah': 1}
+
+    # Same reviews behind both: every review of a selection contributes its words
+    for company, province in [('JNE', None), ('JNE', 'Bali'), ('JNE', 'Jawa Barat')]:
+        rows = REVIEWS[(REVIEWS['company'] == company)
+                       & ((REVIEWS['province'] == province) if province else True)]
+        words = rows['processed_reviews'].fillna('').astype(str).str.split().str.len().sum()
+        assert cube.review_count(company, province) == len(rows)
+        assert index.merged(company, province).sum() == words
+
+
+def test_top_matches_counter_scans(tmp_path):
+    path = str(tmp_path / 'labeled_ngrams.npz')
+    NgramIndex.build(REVIEWS).save(path)
+    index = NgramIndex.load(path)
+    for company in index.companies:
+        for province in [None] + index.provinces:
+            expected = scan_top(REVIEWS, company, province)
+            assert {n: index.top(company, province, n) for n in ORDERS} == expected
@@ -0,0 +1,66 @@
+# The NumPy engine must give gensim's get_document_topics probabilities on a
+# fixed sample of reviews. Engines are exported to a temporary folder, never
+# over the live model_dicts/<name>_lda_engine.npz.
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from model_registry import MODEL_NAMES, ModelRegistry
+from numpy_lda import DEFAULT_SETTINGS, NumpyLda, check_parity, engine_path, export_engine, export_settings
+
+pytest.importorskip('gensim')
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bagus_labeled_documents.csv')
+SAMPLE_SIZE = 500
+
+# gensim starts every document from a random gamma and stops at gamma_threshold,
+# so the two agree to the convergence tolerance, not exactly
+TOLERANCE = 1e-3
+
+
+def has_model(name):
+    registry = ModelRegistry()
+    return os.path.exists(registry.path(name, 'model')) and os.path.exists(registry.path(name, 'dictionary'))
+
+
+@pytest.fixture(scope='module')
+def sample_texts():
+    if not os.path.exists(SAMPLE_PATH):
+        pytest.skip("sample reviews are not available")
+    texts = pd.read_csv(SAMPLE_PATH, nrows=SAMPLE_SIZE)['processed_reviews'].dropna().astype(str).tolist()
+    # Unknown words and an empty document take their own paths through inference
+    return texts + ['', 'kata_yang_tidak_ada_di_kamus']
+
+
+@pytest.mark.parametrize('name', MODEL_NAMES)
+def test_engine_matches_gensim(name, sample_texts, tmp_path):
+    if not has_model(name):
+        pytest.skip(f"{name} model files are not available")
+    engine = NumpyLda.load(export_engine(name, path=str(tmp_path / f'{name}_lda_engine.npz')))
+
+    result = check_parity(name, sample_texts, engine=engine)
+    assert result['documents'] == len(sample_texts)
+    assert result['max_difference'] < TOLERANCE
+    assert result['dominant_mismatches'] == 0
+
+
+@pytest.mark.parametrize('name', MODEL_NAMES)
+def test_engine_matrices_are_memory_mapped(name, tmp_path):
+    if not has_model(name):
+        pytest.skip(f"{name} model files are not available")
+    path = export_engine(name, path=str(tmp_path / f'{name}_lda_engine.npz'))
+    mapped, private = NumpyLda.load(path), NumpyLda.load(path, mmap=False)
+
+    for matrix in (mapped.expElogbeta, mapped.topics):
+        assert isinstance(matrix, np.memmap) or isinstance(matrix.base, np.memmap)
+        assert not matrix.flags.writeable
+    np.testing.assert_array_equal(mapped.expElogbeta, private.expElogbeta)
+    assert export_settings(path) == DEFAULT_SETTINGS
+
+
+def test_compact_exports_never_replace_the_live_engine():
+    name = MODEL_NAMES[0]
+    if not has_model(name):
+        pytest.skip(f"{name} model files are not available")
+    with pytest.raises(ValueError, match="live inference engine"):
+        export_engine(name, path=engine_path(name), keep_n=10)
@@ -0,0 +1,76 @@
+# fast_word_tokenize must give exactly nltk.word_tokenize's tokens: letters-only
+# text, the Treebank contraction splits and inputs that take the NLTK fallback.
+# The full-corpus check stays in: python tokenizer.py ../prepro_cleaned_reviews.csv
+import os
+import pytest
+from tokenizer import SPLIT_WORDS, check_conformance, fast_word_tokenize, letters_only_pattern, ngrams
+
+nltk = pytest.importorskip('nltk')
+try:
+    nltk.word_tokenize('punkt data check')
+except LookupError:
+    pytest.skip("NLTK punkt data is not installed", allow_module_level=True)
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'prepro_cleaned_reviews.csv')
+
+LETTERS_ONLY = [
+    '',
+    '   ',
+    'pengiriman lambat sekali',
+    'kurir  ramah\tdan\nsopan ',
+    'Paket SAMPAI dengan Selamat',
+    'a',
+]
+
+CONTRACTIONS = [f'{word} pakai' for word in SPLIT_WORDS] + [
+    'Cannot', 'GONNA', 'WanNa', 'gotta gimme lemme',
+    'cannotbe', 'gonnas', 'xgotta',
+]
+
+FALLBACK = [
+    "don't",
+    "can't won't",
+    'lambat!!! kecewa.',
+    'sampai 2 hari',
+    '"paket" (rusak)',
+    'harga: rp10.000, mahal?',
+    'e-commerce & kurir',
+    'café ramah',
+]
+
+
+@pytest.mark.parametrize('text', LETTERS_ONLY + CONTRACTIONS + FALLBACK)
+def test_matches_nltk(text):
+    assert fast_word_tokenize(text) == nltk.word_tokenize(text)
+
+
+@pytest.mark.parametrize('word', sorted(SPLIT_WORDS))
+def test_contractions_are_split(word):
+    assert fast_word_tokenize(word) == list(SPLIT_WORDS[word])
+    assert fast_word_tokenize(word.upper()) == [part.upper() for part in SPLIT_WORDS[word]]
+
+
+@pytest.mark.parametrize('text', FALLBACK)
+def test_fallback_inputs_leave_the_fast_path(text):
+    assert not letters_only_pattern.fullmatch(text)
+
+
+def test_ngrams_match_nltk():
+    from nltk.util import ngrams as nltk_ngrams
+    tokens = fast_word_tokenize('pengiriman sangat lambat dan kurir tidak ramah')
+    for n in (2, 3):
+        assert list(ngrams(tokens, n)) == list(nltk_ngrams(tokens, n))
+
+
+def test_check_conformance_reports_mismatches():
+    result = check_conformance(LETTERS_ONLY + CONTRACTIONS + FALLBACK + [None])
+    assert result['texts'] == len(LETTERS_ONLY + CONTRACTIONS + FALLBACK)
+    assert result['fast_path'] == len(LETTERS_ONLY + CONTRACTIONS)
+    assert result['mismatches'] == []
+
+
+@pytest.mark.skipif(not os.path.exists(CORPUS_PATH), reason="preprocessed corpus not available")
+def test_corpus_sample_matches_nltk():
+    import pandas as pd
+    texts = pd.read_csv(CORPUS_PATH, nrows=2000)['processed_reviews'].fillna('').astype(str).tolist()
+    assert check_conformance(texts)['mismatches'] == []
@@ -0,0 +1,153 @@
+# TranslationWorker against the offline FakeTranslator: retries, coalescing,
+# the concurrency bound and per-attempt timeouts. Run with: python -m pytest
+import argparse
+import asyncio
+import pytest
+from translation import FakeTranslator, TranslationWorker, add_translator_args, make_translator
+
+
+class FlakyTranslator(FakeTranslator):
+    # Fails the first `failures` calls, then translates normally
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    async def translate(self, text, dest='id', src='auto'):
+        if self.calls < self.failures:
+            self.calls += 1
+            raise RuntimeError("Fake translation failure")
+        return await super().translate(text, dest=dest, src=src)
+
+
+class CountingTranslator(FakeTranslator):
+    # Records the largest number of translate() calls running at once
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.peak = 0
+
+    async def translate(self, text, dest='id', src='auto'):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().translate(text, dest=dest, src=src)
+        finally:
+            self.active -= 1
+
+
+class SlowFirstTranslator(FakeTranslator):
+    # Only the first call is slow, like one request stuck on the network
+    async def translate(self, text, dest='id', src='auto'):
+        if self.calls == 0:
+            self.calls += 1
+            await asyncio.sleep(1.0)
+        return await super().translate(text, dest=dest, src=src)
+
+
+@pytest.fixture
+def make_worker():
+    workers = []
+
+    def make(translator, **kwargs):
+        kwargs.setdefault('backoff', 0.0)
+        worker = TranslationWorker(lambda: translator, **kwargs).start()
+        workers.append(worker)
+        return worker
+
+    yield make
+    for worker in workers:
+        worker.close()
+
+
+def test_translates_known_and_unknown_texts(make_worker):
+    worker = make_worker(FakeTranslator({'slow delivery': 'pengiriman lambat'}))
+    assert worker.translate('slow delivery', src='en').text == 'pengiriman lambat'
+    result = worker.translate('kurir ramah')
+    assert (result.text, result.origin, result.dest) == ('kurir ramah', 'kurir ramah', 'id')
+
+
+def test_retries_until_success(make_worker):
+    translator = FlakyTranslator(2, mapping={'late': 'telat'})
+    worker = make_worker(translator, retries=3)
+    assert worker.translate('late').text == 'telat'
+    assert translator.calls == 3
+
+
+def test_failing_translator_raises_after_retries(make_worker):
+    translator = FakeTranslator(fail_every=1)
+    worker = make_worker(translator, retries=3)
+    with pytest.raises(RuntimeError, match="Fake translation failure"):
+        worker.translate('late')
+    assert translator.calls == 3
+
+
+def test_translate_many_returns_errors_in_place(make_worker):
+    translator = FakeTranslator({'a': 'x'}, fail_every=2)
+    worker = make_worker(translator, retries=1, max_concurrency=1)
+    results = worker.translate_many(['a', 'b', 'c'])
+    assert results[0].text == 'x'
+    assert isinstance(results[1], RuntimeError)
+    assert results[2].text == 'c'
+
+
+def test_bad_input_is_not_retried(make_worker):
+    translator = FakeTranslator()
+    worker = make_worker(translator, retries=3)
+    with pytest.raises(TypeError):
+        worker.translate(None)
+    assert translator.calls == 1
+
+
+def test_duplicate_texts_are_translated_once(make_worker):
+    translator = FakeTranslator({'a': 'x', 'b': 'y'}, delay=0.05)
+    worker = make_worker(translator)
+    results = worker.translate_many(['a'] * 10 + ['b'] * 5)
+    assert [result.text for result in results] == ['x'] * 10 + ['y'] * 5
+    assert translator.calls == 2
+
+
+def test_same_text_with_other_languages_is_not_coalesced(make_worker):
+    translator = FakeTranslator(delay=0.05)
+    worker = make_worker(translator)
+    futures = [worker._submit_threadsafe('a', 'auto', dest) for dest in ('id', 'en', 'id')]
+    assert [future.result().dest for future in futures] == ['id', 'en', 'id']
+    assert translator.calls == 2
+
+
+def test_concurrency_is_bounded(make_worker):
+    translator = CountingTranslator(delay=0.02)
+    worker = make_worker(translator, max_concurrency=3)
+    results = worker.translate_many([f'text {i}' for i in range(12)])
+    assert [result.text for result in results] == [f'text {i}' for i in range(12)]
+    assert translator.peak == 3
+
+
+def test_attempts_time_out(make_worker):
+    translator = FakeTranslator(delay=1.0)
+    worker = make_worker(translator, retries=2, timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        worker.translate('late')
+    assert translator.calls == 2
+
+
+def test_timed_out_attempt_is_retried(make_worker):
+    translator = SlowFirstTranslator({'late': 'telat'})
+    worker = make_worker(translator, retries=2, timeout=0.05)
+    assert worker.translate('late').text == 'telat'
+    assert translator.calls == 2
+
+
+def test_translate_async_from_another_loop(make_worker):
+    worker = make_worker(FakeTranslator({'late': 'telat'}))
+    assert asyncio.run(worker.translate_async('late')).text == 'telat'
+
+
+def test_make_translator_from_args():
+    parser = argparse.ArgumentParser()
+    add_translator_args(parser)
+    assert make_translator(parser.parse_args([])) is None
+    worker = make_translator(parser.parse_args(['--fake-translator']))
+    try:
+        assert worker.start().translate('late').text == 'late'
+    finally:
+        worker.close()
@@ -0,0 +1,59 @@
+# Promotion switches every artifact of a model at once: the registry never
+# pairs a newly promoted model with the previous version's dictionary. Uses
+# tiny models trained on the spot in a temporary model folder.
+import os
+import pytest
+from model_registry import ModelRegistry
+from update_model import list_versions, promote, save_version
+
+gensim = pytest.importorskip('gensim')
+
+DOCUMENTS = [
+    ['kurir', 'ramah', 'cepat'],
+    ['pengiriman', 'lambat', 'kecewa'],
+    ['paket', 'rusak', 'lambat'],
+    ['pelayanan', 'ramah', 'cepat'],
+]
+
+
+def save_tiny_version(model_dir, version, extra_words):
+    from gensim.corpora import Dictionary
+    from gensim.models import LdaModel
+    documents = DOCUMENTS + [extra_words]
+    dictionary = Dictionary(documents)
+    corpus = [dictionary.doc2bow(document) for document in documents]
+    lda_model = LdaModel(corpus, id2word=dictionary, num_topics=2, passes=1, random_state=0)
+    report = {'documents': len(corpus), 'new_terms': extra_words, 'dictionary_size': len(dictionary), 'seconds': 0.0}
+    return save_version('jelek', lda_model, dictionary, corpus, report, str(model_dir), version)
+
+
+def test_promote_switches_the_whole_version(tmp_path):
+    save_tiny_version(tmp_path, 'v1', ['satu'])
+    save_tiny_version(tmp_path, 'v2', ['dua', 'tiga'])
+    registry = ModelRegistry(str(tmp_path))
+
+    promote('jelek', 'v1', str(tmp_path))
+    first = registry.refresh('jelek')
+    assert registry.artifact_dir('jelek') == str(tmp_path / 'versions' / 'jelek' / 'v1')
+    assert 'satu' in registry.dictionary('jelek').token2id
+
+    # Loads after a promotion stay on the pinned version until refresh()
+    promote('jelek', 'v2', str(tmp_path))
+    assert registry.lda_model('jelek').num_terms == len(registry.dictionary('jelek'))
+    assert 'satu' in registry.dictionary('jelek').token2id
+
+    assert registry.refresh('jelek') != first
+    assert 'dua' in registry.dictionary('jelek').token2id
+    assert registry.lda_model('jelek').num_terms == len(registry.dictionary('jelek'))
+    assert not os.path.exists(registry.current_path('jelek') + '.tmp')
+
+
+def test_promote_rejects_missing_versions(tmp_path, capsys):
+    save_tiny_version(tmp_path, 'v1', ['satu'])
+    with pytest.raises(ValueError, match="No jelek artifacts"):
+        promote('jelek', 'v9', str(tmp_path))
+    assert not os.path.exists(ModelRegistry(str(tmp_path)).current_path('jelek'))
+
+    promote('jelek', 'v1', str(tmp_path))
+    list_versions(str(tmp_path))
+    assert capsys.readouterr().out.split()[:3] == ['jelek', 'v1', '*']
@@ -0,0 +1,113 @@
+# Fast word tokenizer for text already reduced to letters and whitespace.
+# Conformance cases are in test_tokenizer.py; the full-corpus check against
+# nltk.word_tokenize is:
+#   python tokenizer.py ../prepro_cleaned_reviews.csv
+import re
+
+# Text made only of letters and whitespace can be tokenized by splitting
+letters_only_pattern = re.compile(r"[A-Za-z\s]*")
+
+# The only Treebank rules that fire on letters-only text: these words are split in two
+SPLIT_WORDS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+
+_nltk_word_tokenize = None
+
+
+def _fallback_tokenize(text):
+    # Apostrophes and other characters go through NLTK's Treebank rules unchanged
+    global _nltk_word_tokenize
+    if _nltk_word_tokenize is None:
+        from nltk.tokenize import word_tokenize
+        _nltk_word_tokenize = word_tokenize
+    return _nltk_word_tokenize(text)
+
+
+def fast_word_tokenize(text):
+    """
+    Drop-in replacement for nltk.word_tokenize on preprocessed review text.
+
+    Letters-only text is split on whitespace (plus the Treebank contraction
+    splits above); anything else falls back to nltk.word_tokenize.
+    """
+    if not letters_only_pattern.fullmatch(text):
+        return _fallback_tokenize(text)
+
+    tokens = []
+    for word in text.split():
+        parts = SPLIT_WORDS.get(word.lower())
+        if parts is None:
+            tokens.append(word)
+        else:
+            # Keep the original casing of each half
+            tokens.append(word[:len(parts[0])])
+            tokens.append(word[len(parts[0]):])
+    return tokens
+
+
+def ngrams(tokens, n):
+    # Same tuples as nltk.util.ngrams, without importing nltk
+    return zip(*(tokens[i:] for i in range(n)))
+
+
+def check_conformance(texts):
+    """
+    Compare fast_word_tokenize with nltk.word_tokenize on every text.
+
+    Returns:
+        dict: Counts of texts, fast-path hits, mismatches and timings.
+    """
+    import time
+    from nltk.tokenize import word_tokenize
+
+    texts = [text for text in texts if isinstance(text, str)]
+
+    start = time.perf_counter()
+    expected = [word_tokenize(text) for text in texts]
+    nltk_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [fast_word_tokenize(text) for text in texts]
+    fast_time = time.perf_counter() - start
+
+    mismatches = [(text, exp, act) for text, exp, act in zip(texts, expected, actual) if exp != act]
+    fast_path = sum(bool(letters_only_pattern.fullmatch(text)) for text in texts)
+    return {
+        'texts': len(texts),
+        'fast_path': fast_path,
+        'mismatches': mismatches,
+        'nltk_seconds': nltk_time,
+        'fast_seconds': fast_time,
+    }
+
+
+if __name__ == '__main__':
+    import sys
+    import pandas as pd
+    from prepro_script import clean_text
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else '../prepro_cleaned_reviews.csv'
+    df = pd.read_csv(csv_path)
+
+    # Cleaned raw reviews are what preprocessing tokenizes; processed reviews
+    # are what the dashboard's n-gram section tokenizes
+    suites = {
+        'cleaned reviews': [clean_text(text) for text in df['reviews'].dropna().astype(str)],
+        'processed reviews': df['processed_reviews'].fillna('').astype(str).tolist(),
+    }
+    failed = False
+    for name, texts in suites.items():
+        result = check_conformance(texts)
+        print(f"{name}: {result['texts']} texts, {result['fast_path']} on the fast path, "
+              f"{len(result['mismatches'])} mismatches, "
+              f"nltk {result['nltk_seconds']:.2f}s vs fast {result['fast_seconds']:.2f}s")
+        for text, expected, actual in result['mismatches'][:5]:
+            print(f"  {text!r}\n    nltk: {expected}\n    fast: {actual}")
+        failed = failed or bool(result['mismatches'])
+    sys.exit(1 if failed else 0)
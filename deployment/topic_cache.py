@@ -0,0 +1,65 @@
+# Topic inference with a bounded cache from bag-of-words to topic distribution.
+# Short reviews repeat a lot ("pelayanan lambat", "kurir ramah"), so most of
+# them skip LDA inference entirely.
+import numpy as np
+from lru_cache import LruCache
+from model_registry import get_engine, registry
+
+
+def topic_probabilities(lda_model, bows):
+    """
+    Infer topic distributions for a whole chunk in one call, with a gensim
+    LdaModel or a numpy_lda.NumpyLda engine.
+
+    Returns:
+        numpy.ndarray: (documents, topics) probabilities, each row summing to 1.
+    """
+    if not bows:
+        return np.zeros((0, lda_model.num_topics))
+    gamma, _ = lda_model.inference(bows)
+    return gamma / gamma.sum(axis=1, keepdims=True)
+
+
+class TopicCache(LruCache):
+    """
+    Bounded LRU cache of topic distributions.
+
+    Keys are (model name, model version, bag-of-words). The version changes
+    when the model, dictionary or inference engine files change (see
+    ModelRegistry.refresh), so stale entries are never returned and age out
+    of the LRU.
+
+    Args:
+        maxsize (int): Maximum number of cached documents.
+    """
+
+    def __init__(self, maxsize=100000):
+        super().__init__(maxsize)
+
+    def probabilities(self, name, bows):
+        # Same result as topic_probabilities(get_engine(name), bows), cached per distinct document
+        # Load (or re-export) the engine first so the key stamps the engine that infers
+        registry.refresh(name)
+        engine = get_engine(name)
+        version = registry.refresh(name)
+        keys = [(name, version, tuple(bow)) for bow in bows]
+        found = self.get_many(keys)
+
+        # Each distinct missing document is inferred once, in one call
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            inferred = topic_probabilities(engine, [list(key[2]) for key in missing])
+            found.update(zip(missing, inferred))
+            self.put_many(zip(missing, inferred))
+
+        if not keys:
+            return np.zeros((0, engine.num_topics))
+        return np.array([found[key] for key in keys])
+
+
+# Shared by the Inference page, bulk scoring and the inference service in this process
+topic_cache = TopicCache()
+
+
+def cached_topic_probabilities(name, bows):
+    return topic_cache.probabilities(name, bows)
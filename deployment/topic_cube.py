@@ -0,0 +1,155 @@
+# Pre-aggregated review counts by company x province x topic x month, built
+# once per labeled data refresh (see labeled_store.py). Topic distributions for
+# any company / province / month range are read from it in constant time
+# instead of masking the whole DataFrame.
+import numpy as np
+import pandas as pd
+
+
+class TopicCube:
+    """
+    Review counts indexed by company, province, topic and month of parsed_date.
+
+    Three arrays are kept:
+        totals: (companies, provinces + 1, topics) counts over all dates; the
+            last province slot is the sum over provinces ("All Provinces").
+        rows: (companies, provinces + 1) reviews with or without a topic, the
+            size of each selection.
+        prefix: (companies, provinces + 1, topics, months + 1) running totals
+            over the sorted months, so any month range is one subtraction.
+
+    Rows without a parsed_date count in totals but in no month range; rows
+    without a province count only under all provinces.
+
+    Args:
+        df (pandas.DataFrame): Labeled documents with company, province,
+            topic and parsed_date columns.
+    """
+
+    def __init__(self, df):
+        company = pd.Categorical(df['company'])
+        province = pd.Categorical(df['province'])
+        topic = pd.Categorical(df['topic'])
+        month = pd.to_datetime(df['parsed_date'], errors='coerce').dt.to_period('M')
+
+        self.companies = list(company.categories)
+        self.provinces = list(province.categories)
+        self.topics = list(topic.categories)
+        self.months = sorted(month.dropna().unique())
+        self._company_index = {name: i for i, name in enumerate(self.companies)}
+        self._province_index = {name: i for i, name in enumerate(self.provinces)}
+        self._month_index = {value: i for i, value in enumerate(self.months)}
+
+        shape = (len(self.companies), len(self.provinces) + 1, len(self.topics))
+
+        # Every review of a known company, including those without a topic label
+        listed = company.codes >= 0
+        listed_provinces = province.codes[listed].astype(np.int64)
+        listed_provinces[listed_provinces < 0] = len(self.provinces)
+        self.rows = np.zeros(shape[:2], dtype=np.int64)
+        np.add.at(self.rows, (company.codes[listed], listed_provinces), 1)
+        self.rows[:, -1] += self.rows[:, :-1].sum(axis=1)
+
+        rows = (company.codes >= 0) & (topic.codes >= 0)
+        c, p, t = company.codes[rows], province.codes[rows].astype(np.int64), topic.codes[rows]
+        # Reviews without a province land directly in the "All Provinces" slot
+        p[p < 0] = len(self.provinces)
+
+        self.totals = np.zeros(shape, dtype=np.int64)
+        np.add.at(self.totals, (c, p, t), 1)
+        self.totals[:, -1] += self.totals[:, :-1].sum(axis=1)
+
+        # Monthly counts, then running totals along the month axis
+        m = np.array([self._month_index.get(value, -1) for value in month[rows]], dtype=np.int64)
+        dated = m >= 0
+        monthly = np.zeros(shape + (len(self.months),), dtype=np.int64)
+        np.add.at(monthly, (c[dated], p[dated], t[dated], m[dated]), 1)
+        monthly[:, -1] += monthly[:, :-1].sum(axis=1)
+        self.prefix = np.zeros(shape + (len(self.months) + 1,), dtype=np.int64)
+        np.cumsum(monthly, axis=3, out=self.prefix[..., 1:])
+
+    def _slot(self, company, province):
+        # None if the company or province does not occur in the data
+        c = self._company_index.get(company)
+        p = len(self.provinces) if province is None else self._province_index.get(province)
+        return None if c is None or p is None else (c, p)
+
+    def _month_bounds(self, start, end):
+        # Half-open prefix indices for months in [start, end]; None means open-ended
+        lo = 0 if start is None else int(np.searchsorted(self.months, pd.Period(start, 'M'), side='left'))
+        hi = len(self.months) if end is None else int(np.searchsorted(self.months, pd.Period(end, 'M'), side='right'))
+        return lo, max(lo, hi)
+
+    def review_count(self, company, province=None):
+        # Reviews in the selection over all dates, labeled with a topic or not
+        slot = self._slot(company, province)
+        return 0 if slot is None else int(self.rows[slot])
+
+    def counts(self, company, province=None, start=None, end=None):
+        """
+        Reviews per topic for one company.
+
+        Args:
+            company (str): Company name.
+            province (str): Province name, or None for all provinces.
+            start, end (str): Optional first and last month ('YYYY-MM'), inclusive.
+
+        Returns:
+            pandas.Series: Count per topic, indexed by topic label.
+        """
+        slot = self._slot(company, province)
+        if slot is None:
+            values = np.zeros(len(self.topics), dtype=np.int64)
+        elif start is None and end is None:
+            values = self.totals[slot]
+        else:
+            lo, hi = self._month_bounds(start, end)
+            values = self.prefix[slot][:, hi] - self.prefix[slot][:, lo]
+        return pd.Series(values, index=self.topics, name='count')
+
+    def distribution(self, company, province=None, start=None, end=None):
+        # Topics with at least one review, largest first, as value_counts() orders them
+        counts = self.counts(company, province, start, end)
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    def monthly(self, company, province=None):
+        # (months, topics) review counts, e.g. for a trend chart
+        slot = self._slot(company, province)
+        if slot is None:
+            values = np.zeros((len(self.months), len(self.topics)), dtype=np.int64)
+        else:
+            values = np.diff(self.prefix[slot], axis=1).T
+        return pd.DataFrame(values, index=pd.PeriodIndex(self.months, freq='M'), columns=self.topics)
+
+
+def scan_counts(df, company, province=None):
+    # The Analysis page's original row scan, kept as the reference for the check below
+    rows = df[df['company'] == company] if province is None else df[(df['company'] == company) & (df['province'] == province)]
+    return rows['topic'].value_counts()
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    from labeled_store import load_labeled
+
+    for csv_path in sys.argv[1:] or ['labeled_documents.csv', 'bagus_labeled_documents.csv']:
+        df = load_labeled(csv_path)
+        start = time.perf_counter()
+        cube = TopicCube(df)
+        build_seconds = time.perf_counter() - start
+
+        filters = [(company, province) for company in cube.companies for province in [None] + cube.provinces]
+        start = time.perf_counter()
+        expected = [scan_counts(df, company, province) for company, province in filters]
+        scan_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = [cube.counts(company, province) for company, province in filters]
+        cube_seconds = time.perf_counter() - start
+
+        mismatches = sum(not counts.reindex(cube.topics, fill_value=0).astype('int64').equals(result.astype('int64'))
+                         for counts, result in zip(expected, actual))
+        print(f"{csv_path}: {len(df)} reviews, cube {cube.totals.shape} x {len(cube.months)} months, "
+              f"built in {build_seconds * 1000:.1f} ms")
+        print(f"  {len(filters)} filters: row scans {scan_seconds / len(filters) * 1e3:.3f} ms each, "
+              f"cube {cube_seconds / len(filters) * 1e3:.3f} ms each, {mismatches} mismatches")
@@ -0,0 +1,235 @@
+import asyncio
+import atexit
+import contextlib
+import threading
+from googletrans import Translator
+
+
+class FakeTranslated:
+    def __init__(self, text, origin, src, dest):
+        self.text = text
+        self.origin = origin
+        self.src = src
+        self.dest = dest
+
+
+class FakeTranslator:
+    """
+    Offline stand-in for googletrans.Translator with the same async translate().
+
+    Args:
+        mapping (dict): Known translations; other texts are returned unchanged.
+        delay (float): Seconds to sleep per call, to mimic network latency.
+        fail_every (int): Raise on every n-th call (0 disables), to exercise retries.
+    """
+
+    def __init__(self, mapping=None, delay=0.0, fail_every=0):
+        self.mapping = mapping or {}
+        self.delay = delay
+        self.fail_every = fail_every
+        self.calls = 0
+
+    async def translate(self, text, dest='id', src='auto'):
+        self.calls += 1
+        if not isinstance(text, str):
+            raise TypeError(f"Cannot translate {type(text).__name__}")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_every and self.calls % self.fail_every == 0:
+            raise RuntimeError("Fake translation failure")
+        return FakeTranslated(self.mapping.get(text, text), text, src, dest)
+
+
+class TranslationWorker:
+    """
+    Long-lived translation worker that owns one event loop (on a daemon thread)
+    and one translator client.
+
+    Concurrent requests are queued and coalesced into batches: identical texts
+    that are queued or already in flight are translated once, and at most
+    max_concurrency requests hit the client at a time. Failed requests are
+    retried with exponential backoff.
+
+    Args:
+        translator_factory (callable): Builds the client, e.g. Translator or FakeTranslator.
+        max_concurrency (int): Maximum number of in-flight translation requests.
+        batch_size (int): Maximum number of queued requests coalesced into one batch.
+        batch_window (float): Seconds to wait for more requests before dispatching a batch;
+            0 coalesces only what is already queued, adding no latency.
+        retries (int): Attempts per text before the error is returned to the caller.
+        backoff (float): Initial retry delay in seconds, doubled after each failure.
+        timeout (float): Seconds an attempt may take before it counts as a failed
+            attempt; None waits indefinitely.
+    """
+
+    def __init__(self, translator_factory=Translator, max_concurrency=8, batch_size=32,
+                 batch_window=0.0, retries=3, backoff=0.5, timeout=None):
+        self.translator_factory = translator_factory
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self.loop is not None:
+                return self
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+            self._thread.start()
+            ready.wait()
+        return self
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        # The client, semaphore and queue all belong to the worker's loop
+        self.translator = self.translator_factory()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._queue = asyncio.Queue()
+        self._inflight = {}
+        self._batcher_task = self.loop.create_task(self._batcher())
+        ready.set()
+        self.loop.run_forever()
+
+    async def _shutdown(self):
+        self._batcher_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._batcher_task
+
+    def close(self):
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+        self.loop = None
+
+    async def _translate_one(self, text, src, dest):
+        delay = self.backoff
+        for attempt in range(self.retries):
+            try:
+                async with self._semaphore:
+                    return await asyncio.wait_for(self.translator.translate(text, src=src, dest=dest), self.timeout)
+            except (TypeError, ValueError):
+                # Bad input or language code; retrying cannot help
+                raise
+            except Exception:
+                if attempt == self.retries - 1:
+                    raise
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def _dispatch(self, key):
+        try:
+            result = await self._translate_one(*key)
+        except Exception as e:
+            for future in self._inflight.pop(key):
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future in self._inflight.pop(key):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _batcher(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self.loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Identical (text, src, dest) requests share one translation
+            for key, future in batch:
+                if key in self._inflight:
+                    self._inflight[key].append(future)
+                else:
+                    self._inflight[key] = [future]
+                    self.loop.create_task(self._dispatch(key))
+
+    async def _submit(self, text, src, dest):
+        future = self.loop.create_future()
+        await self._queue.put(((text, src, dest), future))
+        return await future
+
+    def _submit_threadsafe(self, text, src, dest):
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._submit(text, src, dest), self.loop)
+
+    async def translate_async(self, text, src='auto', dest='id'):
+        # Usable from any event loop, including Streamlit's or a notebook's
+        self.start()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            return await self._submit(text, src, dest)
+        return await asyncio.wrap_future(self._submit_threadsafe(text, src, dest))
+
+    def translate(self, text, src='auto', dest='id'):
+        return self._submit_threadsafe(text, src, dest).result()
+
+    def translate_many(self, texts, src='auto', dest='id'):
+        """
+        Translate many texts through the throttled, retrying pipeline.
+
+        Returns:
+            list: One Translated per text, or the exception raised for that text.
+        """
+        futures = [self._submit_threadsafe(text, src, dest) for text in texts]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+_default_worker = None
+_default_lock = threading.Lock()
+
+
+def add_translator_args(parser):
+    # Translator options shared by the command-line tools
+    parser.add_argument('--fake-translator', action='store_true',
+                        help="echo texts instead of calling Google Translate (offline testing)")
+
+
+def make_translator(args):
+    """
+    Translation worker chosen by the add_translator_args options.
+
+    Returns:
+        TranslationWorker: Offline worker for --fake-translator, or None to
+            keep the preprocessor's cached Google Translate worker.
+    """
+    if args.fake_translator:
+        return TranslationWorker(FakeTranslator)
+    return None
+
+
+def get_translation_worker():
+    # Process-wide worker shared by every caller
+    global _default_worker
+    with _default_lock:
+        if _default_worker is None:
+            _default_worker = TranslationWorker()
+            atexit.register(_default_worker.close)
+        return _default_worker
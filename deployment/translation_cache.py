@@ -0,0 +1,165 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class CachedTranslation:
+    def __init__(self, text, origin, dest):
+        self.text = text
+        self.origin = origin
+        self.dest = dest
+
+
+class TranslationCache:
+    """
+    Persistent SQLite cache of translations keyed by (sha256 of source text, dest).
+
+    Args:
+        path (str): SQLite database file.
+        max_entries (int): Size bound; least recently used entries are evicted past it.
+    """
+
+    def __init__(self, path, max_entries=200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " text_hash TEXT NOT NULL,"
+            " dest TEXT NOT NULL,"
+            " translated TEXT NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (text_hash, dest))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON translations (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, text, dest='id'):
+        return self.get_many([text], dest).get(text)
+
+    def get_many(self, texts, dest='id'):
+        # Returns {text: translation} for the texts found; non-strings are never cached
+        keys = {}
+        for text in texts:
+            if isinstance(text, str):
+                keys.setdefault(self.text_hash(text), []).append(text)
+
+        found = {}
+        with self._lock:
+            hashes = list(keys)
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, translated FROM translations"
+                    f" WHERE dest = ? AND text_hash IN ({placeholders})",
+                    [dest] + chunk,
+                ).fetchall()
+                for text_hash, translated in rows:
+                    for text in keys[text_hash]:
+                        found[text] = translated
+
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE translations SET last_used = ? WHERE text_hash = ? AND dest = ?",
+                [(now, self.text_hash(text), dest) for text in found],
+            )
+            self._conn.commit()
+
+            lookups = sum(len(group) for group in keys.values())
+            self.hits += len(found)
+            self.misses += lookups - len(found)
+        return found
+
+    def put(self, text, translated, dest='id'):
+        self.put_many([(text, translated)], dest)
+
+    def put_many(self, pairs, dest='id'):
+        now = time.time()
+        rows = [(self.text_hash(text), dest, translated, now)
+                for text, translated in pairs if isinstance(text, str)]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)", rows)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM translations WHERE rowid IN ("
+                " SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'size': size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'file_bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedTranslationWorker:
+    """
+    Wraps a TranslationWorker so only texts missing from the cache are translated.
+    Exposes the same translate / translate_async / translate_many methods.
+    """
+
+    def __init__(self, worker, cache):
+        self.worker = worker
+        self.cache = cache
+
+    def translate(self, text, src='auto', dest='id'):
+        cached = self.cache.get(text, dest)
+        if cached is not None:
+            return CachedTranslation(cached, text, dest)
+        translated = self.worker.translate(text, src=src, dest=dest)
+        self.cache.put(text, translated.text, dest)
+        return translated
+
+    async def translate_async(self, text, src='auto', dest='id'):
+        cached = self.cache.get(text, dest)
+        if cached is not None:
+            return CachedTranslation(cached, text, dest)
+        translated = await self.worker.translate_async(text, src=src, dest=dest)
+        self.cache.put(text, translated.text, dest)
+        return translated
+
+    def translate_many(self, texts, src='auto', dest='id'):
+        texts = list(texts)
+        cached = self.cache.get_many(texts, dest)
+        missing = [text for text in texts if text not in cached] if cached else texts
+
+        translated = self.worker.translate_many(missing, src=src, dest=dest)
+        self.cache.put_many(
+            [(text, result.text) for text, result in zip(missing, translated)
+             if not isinstance(result, BaseException)],
+            dest,
+        )
+
+        fresh = iter(translated)
+        return [CachedTranslation(cached[text], text, dest) if text in cached else next(fresh)
+                for text in texts]
@@ -0,0 +1,239 @@
+# Incremental model update: fold newly preprocessed reviews into the saved LDA
+# models with gensim's online update instead of retraining from scratch.
+# Run from the deployment folder:
+#   python update_model.py new_reviews.csv              # CSV with rating + processed_reviews
+#   python update_model.py --list                       # saved versions
+#   python update_model.py --promote jelek 20250130-101500
+# Every update is saved under model_dicts/versions/<name>/<version>/ and then
+# promoted by pointing model_dicts/versions/<name>/current at it, where the
+# registry picks it up on its next refresh. Promote 'base' to roll back to the
+# notebook-trained models.
+import argparse
+import json
+import os
+import pickle
+import shutil
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from model_registry import MODEL_DIR, MODEL_NAMES, ModelRegistry
+from tokenizer import fast_word_tokenize
+
+# Vocabulary rules from the notebook's filter_extremes; keep_n caps the total dictionary size
+DICTIONARY_RULES = {
+    'jelek': {'no_below': 5, 'no_above': 0.5, 'keep_n': 5000},
+    'bagus': {'no_below': 5, 'no_above': 0.5, 'keep_n': 1250},
+}
+
+
+def artifact_files(name, model_dir=MODEL_DIR):
+    # Every file that makes up one model version: gensim's split model files, dictionary and corpus
+    prefix = f'{name}_lda_'
+    return sorted(f for f in os.listdir(model_dir)
+                  if f.startswith(prefix) and not f.endswith(('.tmp', '.npz')))
+
+
+def extend_dictionary(dictionary, token_lists, no_below=5, no_above=0.5, keep_n=None, max_new_terms=None):
+    """
+    Add documents to the dictionary, keeping only new tokens that pass the rules.
+
+    Existing ids never change: new tokens are only appended, and the
+    document-frequency rules are checked against the updated totals.
+
+    Returns:
+        list: Tokens added to the dictionary, in id order.
+    """
+    previous_size = len(dictionary)
+    dictionary.add_documents(token_lists)
+    candidates = [token_id for token_id in dictionary.token2id.values() if token_id >= previous_size]
+
+    # Same tests as filter_extremes, applied to the new tokens only
+    max_df = no_above * dictionary.num_docs
+    accepted = [token_id for token_id in candidates if no_below <= dictionary.dfs[token_id] <= max_df]
+    accepted.sort(key=lambda token_id: (-dictionary.dfs[token_id], token_id))
+    room = len(accepted)
+    if keep_n is not None:
+        room = min(room, max(0, keep_n - previous_size))
+    if max_new_terms is not None:
+        room = min(room, max_new_terms)
+    accepted = set(accepted[:room])
+
+    # filter_tokens compactifies; old ids are 0..previous_size-1, so they map to themselves
+    dictionary.filter_tokens(bad_ids=[token_id for token_id in candidates if token_id not in accepted])
+    return [dictionary[token_id] for token_id in range(previous_size, len(dictionary))]
+
+
+def extend_model(lda_model, dictionary):
+    # Grow the topic-word state for tokens appended to the dictionary
+    new_terms = len(dictionary) - lda_model.num_terms
+    if new_terms <= 0:
+        return 0
+    dtype = lda_model.dtype
+    num_topics = lda_model.num_topics
+
+    # New words start with no counts and the average learned prior
+    eta = np.concatenate([lda_model.eta, np.full(new_terms, lda_model.eta.mean(), dtype=dtype)])
+    lda_model.eta = lda_model.state.eta = eta
+    lda_model.state.sstats = np.hstack([lda_model.state.sstats, np.zeros((num_topics, new_terms), dtype=dtype)])
+    lda_model.num_terms = len(dictionary)
+    lda_model.id2word = dictionary
+    lda_model.sync_state()
+    return new_terms
+
+
+def update_model(name, token_lists, model_dir=MODEL_DIR, passes=10, chunksize=500, max_new_terms=None):
+    """
+    Extend one model's dictionary and update the model online with new documents.
+
+    Args:
+        name (str): 'jelek' or 'bagus'.
+        token_lists (list): Tokenized, preprocessed reviews.
+        passes (int): Passes over the new documents only.
+        chunksize (int): Documents per online update, as in the notebook.
+        max_new_terms (int): Optional cap on tokens added to the dictionary.
+
+    Returns:
+        tuple: (lda_model, dictionary, corpus, report dict)
+    """
+    # Private copies: mmap='r' arrays are read-only and cannot be updated
+    registry = ModelRegistry(model_dir, mmap=None)
+    lda_model, dictionary = registry.lda_model(name), registry.dictionary(name)
+    corpus = list(registry.corpus(name))
+    parent = registry.version(name)
+
+    start = time.perf_counter()
+    added = extend_dictionary(dictionary, token_lists, max_new_terms=max_new_terms, **DICTIONARY_RULES[name])
+    extend_model(lda_model, dictionary)
+
+    bows = [dictionary.doc2bow(tokens) for tokens in token_lists]
+    bows = [bow for bow in bows if bow]
+    perplexity_before = lda_model.log_perplexity(bows) if bows else None
+    if bows:
+        lda_model.update(bows, chunksize=chunksize, passes=passes, eval_every=None)
+    corpus.extend(bows)
+
+    report = {
+        'model': name,
+        'parent_version': parent,
+        'documents': len(bows),
+        'new_terms': added,
+        'dictionary_size': len(dictionary),
+        'log_perplexity_before': perplexity_before,
+        'log_perplexity_after': lda_model.log_perplexity(bows) if bows else None,
+        'seconds': time.perf_counter() - start,
+    }
+    return lda_model, dictionary, corpus, report
+
+
+def save_version(name, lda_model, dictionary, corpus, report, model_dir=MODEL_DIR, version=None):
+    # Write a complete artifact set under versions/<name>/<version>/
+    version = version or datetime.now().strftime('%Y%m%d-%H%M%S')
+    registry = ModelRegistry(os.path.join(model_dir, 'versions', name, version))
+    os.makedirs(registry.model_dir)
+    lda_model.save(registry.path(name, 'model'))
+    dictionary.save(registry.path(name, 'dictionary'))
+    with open(registry.path(name, 'corpus'), 'wb') as f:
+        pickle.dump(corpus, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(registry.model_dir, 'manifest.json'), 'w') as f:
+        json.dump(dict(report, version=version, created=datetime.now().isoformat(timespec='seconds')), f, indent=2)
+    return version
+
+
+def snapshot_base(name, model_dir=MODEL_DIR):
+    # Keep the notebook-trained artifacts as the first version so an update can be rolled back
+    base_dir = os.path.join(model_dir, 'versions', name, 'base')
+    if not os.path.exists(base_dir):
+        os.makedirs(base_dir)
+        for file_name in artifact_files(name, model_dir):
+            shutil.copy2(os.path.join(model_dir, file_name), base_dir)
+
+
+def promote(name, version, model_dir=MODEL_DIR):
+    # Make a saved version live by rewriting the registry's current pointer in one os.replace;
+    # the version folder is never modified, so readers see either the old or the new artifact set
+    registry = ModelRegistry(model_dir)
+    version_dir = os.path.join(model_dir, 'versions', name, version)
+    files = artifact_files(name, version_dir) if os.path.isdir(version_dir) else []
+    if not files:
+        raise ValueError(f"No {name} artifacts in {version_dir}")
+    tmp_path = registry.current_path(name) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, registry.current_path(name))
+
+
+def list_versions(model_dir=MODEL_DIR):
+    for name in MODEL_NAMES:
+        name_dir = os.path.join(model_dir, 'versions', name)
+        versions = sorted(os.listdir(name_dir)) if os.path.isdir(name_dir) else []
+        live = os.path.basename(ModelRegistry(model_dir).artifact_dir(name))
+        for version in versions:
+            if not os.path.isdir(os.path.join(name_dir, version)):
+                continue
+            manifest = os.path.join(name_dir, version, 'manifest.json')
+            summary = ''
+            if os.path.exists(manifest):
+                with open(manifest) as f:
+                    report = json.load(f)
+                if 'coherence' in report:
+                    # Written by sweep_models.py
+                    summary = (f"sweep best: {report['num_topics']} topics, c_v {report['coherence']:.4f}, "
+                               f"{report['dictionary_size']} words")
+                else:
+                    summary = (f"+{report['documents']} docs, +{len(report['new_terms'])} terms, "
+                               f"{report['dictionary_size']} words, {report['seconds']:.1f}s")
+            print(f"{name:<6} {version:<16} {'*' if version == live else ' '} {summary}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the LDA models online with newly preprocessed reviews.")
+    parser.add_argument('input', nargs='?', help="CSV with rating and processed_reviews columns")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--passes', type=int, default=10, help="passes over the new reviews")
+    parser.add_argument('--chunksize', type=int, default=500)
+    parser.add_argument('--max-new-terms', type=int, help="cap on words added to each dictionary")
+    parser.add_argument('--no-promote', action='store_true', help="save the new version without making it live")
+    parser.add_argument('--list', action='store_true', help="list saved versions")
+    parser.add_argument('--promote', nargs=2, metavar=('MODEL', 'VERSION'), help="make a saved version live")
+    args = parser.parse_args()
+
+    if args.list:
+        list_versions(args.model_dir)
+        return
+    if args.promote:
+        promote(*args.promote, model_dir=args.model_dir)
+        print(f"Promoted {args.promote[0]} {args.promote[1]}")
+        return
+    if not args.input:
+        parser.error("an input CSV is required")
+
+    df = pd.read_csv(args.input).dropna(subset=['processed_reviews'])
+    # Same split as the notebook: ratings 1-3 go to jelek, 4-5 to bagus
+    splits = {'jelek': df[df['rating'] <= 3], 'bagus': df[df['rating'] >= 4]}
+
+    for name, rows in splits.items():
+        token_lists = [fast_word_tokenize(str(text)) for text in rows['processed_reviews']]
+        if not token_lists:
+            print(f"{name}: no new reviews")
+            continue
+
+        snapshot_base(name, args.model_dir)
+        lda_model, dictionary, corpus, report = update_model(
+            name, token_lists, args.model_dir, passes=args.passes, chunksize=args.chunksize,
+            max_new_terms=args.max_new_terms,
+        )
+        version = save_version(name, lda_model, dictionary, corpus, report, args.model_dir)
+        if not args.no_promote:
+            promote(name, version, args.model_dir)
+
+        print(f"{name}: {report['documents']} reviews, {len(report['new_terms'])} new words "
+              f"(dictionary {report['dictionary_size']}), updated in {report['seconds']:.1f}s")
+        if report['log_perplexity_before'] is not None:
+            print(f"  log perplexity bound on new reviews: {report['log_perplexity_before']:.3f} -> "
+                  f"{report['log_perplexity_after']:.3f}")
+        print(f"  saved version {version}{'' if args.no_promote else ' (live)'}")
+
+
+if __name__ == '__main__':
+    main()
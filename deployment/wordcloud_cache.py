@@ -0,0 +1,113 @@
+# Word clouds for the Analysis pages, drawn from the n-gram index's word counts
+# with generate_from_frequencies and kept as PNG bytes in a bounded cache. The
+# same company / province / sentiment view is rendered once per version of the
+# labeled data and then served to every session in the process.
+import io
+from wordcloud import STOPWORDS, WordCloud
+from labeled_store import load_ngrams, store
+from lru_cache import LruCache
+
+WIDTH = 800
+HEIGHT = 400
+
+
+def cloud_frequencies(counts):
+    """
+    Apply WordCloud.generate's word rules to precounted words.
+
+    Words shorter than two characters, numbers and wordcloud's stopwords are
+    dropped, and a plural ending in 's' is folded into its singular when both
+    occur. Collocations are not added; the pages show bigrams in their own
+    table.
+
+    Args:
+        counts (dict): Word -> count.
+
+    Returns:
+        dict: Word -> count, ready for generate_from_frequencies.
+    """
+    words = {word: count for word, count in counts.items()
+             if len(word) > 1 and not word.isdigit() and word.lower() not in STOPWORDS}
+    frequencies = {}
+    for word, count in words.items():
+        if word.endswith('s') and not word.endswith('ss') and word[:-1] in words:
+            word = word[:-1]
+        frequencies[word] = frequencies.get(word, 0) + count
+    return frequencies
+
+
+def render_png(frequencies, width=WIDTH, height=HEIGHT, background_color='white'):
+    # None when there is nothing to draw; WordCloud raises on empty input
+    if not frequencies:
+        return None
+    cloud = WordCloud(width=width, height=height, background_color=background_color)
+    cloud.generate_from_frequencies(frequencies)
+    buffer = io.BytesIO()
+    cloud.to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class WordCloudCache(LruCache):
+    """
+    Bounded LRU cache of rendered word cloud PNGs; get(key, render) renders
+    on a miss.
+
+    Keys are (company, province, sentiment, data version); the version is the
+    labeled CSV's stamp (see LabeledStore.version), so a refreshed CSV never
+    serves an old image and its entries age out of the LRU.
+
+    Args:
+        maxsize (int): Maximum number of cached images (about 100-200 KB each).
+    """
+
+    def __init__(self, maxsize=64):
+        super().__init__(maxsize)
+
+
+# Shared by both Analysis pages and every session in this process
+wordcloud_cache = WordCloudCache()
+
+
+def word_cloud_png(csv_path, sentiment, company, province=None):
+    """
+    Word cloud of one company's reviews, optionally for one province.
+
+    Args:
+        csv_path (str): Labeled documents CSV.
+        sentiment (str): 'jelek' or 'bagus', the dataset the CSV holds.
+        province (str): Province name, or None for all provinces.
+
+    Returns:
+        bytes: PNG image, or None if the selection has no words.
+    """
+    key = (company, province, sentiment, store.version(csv_path))
+    return wordcloud_cache.get(key, lambda: render_png(
+        cloud_frequencies(load_ngrams(csv_path).frequencies(company, province))))
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    import pandas as pd
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'labeled_documents.csv'
+    sentiment = sys.argv[2] if len(sys.argv) > 2 else 'jelek'
+    df = pd.read_csv(csv_path)
+    company = df['company'].mode()[0]
+    texts = df.loc[df['company'] == company, 'processed_reviews'].fillna('').astype(str)
+
+    start = time.perf_counter()
+    WordCloud(width=WIDTH, height=HEIGHT, background_color='white').generate(' '.join(texts)).to_image()
+    text_seconds = time.perf_counter() - start
+    load_ngrams(csv_path)
+    start = time.perf_counter()
+    word_cloud_png(csv_path, sentiment, company)
+    cold_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    word_cloud_png(csv_path, sentiment, company)
+    cached_seconds = time.perf_counter() - start
+
+    print(f"{csv_path}: {company}, all provinces ({len(texts)} reviews)")
+    print(f"  generate() from text    {text_seconds * 1000:8.1f} ms")
+    print(f"  from frequencies + PNG  {cold_seconds * 1000:8.1f} ms")
+    print(f"  cached PNG              {cached_seconds * 1000:8.3f} ms")